@@ -220,6 +220,69 @@ def create_closed_position(
         return cursor.lastrowid
 
 
+def create_imported_positions_bulk(
+    open_positions: List[dict],
+    closed_positions: List[dict]
+) -> int:
+    """
+    Insert the open and already-closed positions from a CSV import in one transaction.
+
+    Open dicts take the same fields as create_position (without ibkr_con_id),
+    closed dicts the same fields as create_closed_position. Either nothing or
+    everything is written. Returns the number of rows inserted.
+    """
+    if not open_positions and not closed_positions:
+        return 0
+
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.executemany('''
+            INSERT INTO positions (
+                underlying, option_type, strike, expiry, quantity,
+                premium_collected, strategy_type, open_date, notes
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [
+            (
+                p['underlying'].upper(),
+                p['option_type'].upper(),
+                p['strike'],
+                p['expiry'],
+                p['quantity'],
+                p['premium_collected'],
+                p['strategy_type'].upper(),
+                p.get('open_date') or date.today().isoformat(),
+                p.get('notes')
+            )
+            for p in open_positions
+        ])
+        cursor.executemany('''
+            INSERT INTO positions (
+                underlying, option_type, strike, expiry, quantity,
+                premium_collected, strategy_type, open_date, close_date,
+                close_price, status, notes
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [
+            (
+                p['underlying'].upper(),
+                p['option_type'].upper(),
+                p['strike'],
+                p['expiry'],
+                p['quantity'],
+                p['premium_collected'],
+                p['strategy_type'].upper(),
+                p['open_date'],
+                p['close_date'],
+                p['close_price'],
+                p.get('status', 'CLOSED'),
+                p.get('notes')
+            )
+            for p in closed_positions
+        ])
+        # Closing the connection without this commit rolls both inserts back
+        conn.commit()
+        return len(open_positions) + len(closed_positions)
+
+
 def get_open_positions() -> List[dict]:
     """Get all open option positions."""
     with get_db_connection() as conn:
@@ -3,6 +3,8 @@
 import logging
 import asyncio
 import random
+import time
+import traceback
 from typing import Optional, List
 from dataclasses import dataclass, asdict
 from datetime import datetime
@@ -159,7 +161,6 @@ class IBKRService:
                 finally:
                     self._ib = None
 
-            import time
             time.sleep(0.5)
 
             logger.info(f"Connecting to IBKR at {host}:{port} with client ID {client_id}")
@@ -219,7 +220,6 @@ class IBKRService:
 
             if is_conflict and _retry_count < max_retries:
                 logger.info(f"Connection issue, retry {_retry_count + 1}/{max_retries}...")
-                import time
                 time.sleep(1)
 
                 return self.connect(
@@ -321,7 +321,6 @@ class IBKRService:
 
         except Exception as e:
             logger.error(f"Error getting positions: {e}")
-            import traceback
             logger.error(traceback.format_exc())
             return []
 
@@ -417,8 +416,24 @@ class IBKRService:
             logger.error(f"Error getting expirations for {symbol}: {e}")
             return []
 
-    def get_option_chain_strikes(self, symbol: str, expiry: str) -> List[float]:
-        """Get available strikes for a symbol and expiry."""
+    def get_option_chain_strikes(
+        self,
+        symbol: str,
+        expiry: str,
+        price_low: Optional[float] = None,
+        price_high: Optional[float] = None,
+        limit: Optional[int] = None
+    ) -> List[float]:
+        """
+        Get available strikes for a symbol and expiry.
+
+        Args:
+            symbol: Underlying symbol
+            expiry: Expiration in YYYYMMDD format
+            price_low: Drop strikes below this price (optional)
+            price_high: Drop strikes above this price (optional)
+            limit: Return at most this many strikes, lowest first (optional)
+        """
         if not self.is_connected:
             logger.warning(f"get_option_chain_strikes: Not connected")
             return []
@@ -441,7 +456,14 @@ class IBKRService:
                 if expiry in chain.expirations:
                     strikes.update(chain.strikes)
 
-            return sorted([float(s) for s in strikes])
+            result = sorted([float(s) for s in strikes])
+            if price_low is not None or price_high is not None:
+                low = price_low if price_low is not None else float('-inf')
+                high = price_high if price_high is not None else float('inf')
+                result = [s for s in result if low <= s <= high]
+            if limit is not None:
+                result = result[:limit]
+            return result
         except Exception as e:
             logger.error(f"Error getting strikes for {symbol} {expiry}: {e}")
             return []
@@ -1,31 +1,40 @@
 """FastAPI backend for Options Buddy React app."""
 
 from fastapi import FastAPI, HTTPException, Query, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Optional, List, Dict, Tuple
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict, Tuple, AsyncIterator, BinaryIO, NamedTuple
 from datetime import datetime, date, time
+from time import monotonic
 import pytz
+import numpy as np
 import logging
+import math
+import asyncio
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict, deque
+from functools import lru_cache, partial
+from operator import attrgetter
 import httpx
 import json
+import codecs
 import csv
-import io
 import re
 
 from config import settings
 from put_call_parity import (
-    calculate_put_call_parity_violation,
-    calculate_synthetic_prices,
+    calculate_parity_batch,
     detect_statistical_outliers,
-    calculate_opportunity_score as calc_parity_opportunity_score
+    calculate_opportunity_scores as calc_parity_opportunity_scores
 )
 from database import (
     get_open_positions,
     get_closed_positions,
     get_position_by_id,
     create_position,
-    create_closed_position,
+    create_imported_positions_bulk,
     close_position,
     update_position,
     clear_all_positions,
@@ -73,7 +82,8 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="Options Buddy API",
     description="Backend API for Options Buddy trading dashboard",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse  # Faster serialization for large scan/AI payloads
 )
 
 # Configure CORS for React frontend
@@ -161,6 +171,7 @@ class ParityScanRequest(BaseModel):
     risk_free_rate: float = 0.045
     parity_threshold: float = 0.02
     max_results: int = 10
+    scan_depth: Optional[int] = Field(None, ge=1)  # Pairs analyzed (default: max_results * 3)
 
 
 class MispricedOption(BaseModel):
@@ -460,6 +471,7 @@ def add_position(position: PositionCreate):
         open_date=position.open_date,
         notes=position.notes
     )
+    _invalidate_portfolio_ctx()
     return {"id": position_id, "message": "Position created"}
 
 
@@ -470,6 +482,7 @@ def modify_position(position_id: int, updates: PositionUpdate):
     success = update_position(position_id, **update_dict)
     if not success:
         raise HTTPException(status_code=404, detail="Position not found or no changes made")
+    _invalidate_portfolio_ctx()
     return {"message": "Position updated"}
 
 
@@ -484,6 +497,7 @@ def close_position_endpoint(position_id: int, close_data: PositionClose):
     )
     if not success:
         raise HTTPException(status_code=404, detail="Position not found")
+    _invalidate_portfolio_ctx()
     return {"message": "Position closed"}
 
 
@@ -596,6 +610,7 @@ def sync_from_ibkr(account: Optional[str] = None):
         synced_options += 1
         logger.info(f"Synced option: {pos['symbol']} ${pos.get('strike')} {option_type} exp {expiry} strategy={strategy_type} (ID: {position_id})")
 
+    _invalidate_portfolio_ctx()
     return {
         "message": "Sync completed",
         "stocks_synced": synced_stocks,
@@ -622,6 +637,7 @@ def add_or_update_holding(holding: StockHoldingUpsert):
         avg_cost=holding.avg_cost,
         current_price=holding.current_price
     )
+    _invalidate_portfolio_ctx()
     return {"id": holding_id, "message": "Holding saved"}
 
 
@@ -631,6 +647,7 @@ def remove_holding(symbol: str):
     success = delete_stock_holding(symbol)
     if not success:
         raise HTTPException(status_code=404, detail="Holding not found")
+    _invalidate_portfolio_ctx()
     return {"message": "Holding deleted"}
 
 
@@ -674,14 +691,18 @@ def delete_watchlist_symbol(watchlist_id: int, symbol: str):
 
 # ==================== MARKET STATUS ====================
 
+MARKET_TZ = pytz.timezone('America/New_York')
+MARKET_OPEN = time(9, 30)
+MARKET_CLOSE = time(16, 0)
+
+
 def get_market_status() -> dict:
     """
     Check if the US stock market is currently open.
     NYSE/NASDAQ hours: 9:30 AM - 4:00 PM ET, Monday-Friday
     Does not account for market holidays.
     """
-    eastern = pytz.timezone('America/New_York')
-    now = datetime.now(eastern)
+    now = datetime.now(MARKET_TZ)
 
     # Check if it's a weekend (Saturday=5, Sunday=6)
     if now.weekday() >= 5:
@@ -694,11 +715,9 @@ def get_market_status() -> dict:
             "next_open": "Monday 9:30 AM ET"
         }
 
-    market_open = time(9, 30)
-    market_close = time(16, 0)
     current_time = now.time()
 
-    if current_time < market_open:
+    if current_time < MARKET_OPEN:
         return {
             "is_open": False,
             "status": "pre_market",
@@ -707,7 +726,7 @@ def get_market_status() -> dict:
             "current_time_et": now.strftime("%Y-%m-%d %H:%M:%S ET"),
             "next_open": "Today 9:30 AM ET"
         }
-    elif current_time > market_close:
+    elif current_time > MARKET_CLOSE:
         next_open = "Tomorrow 9:30 AM ET" if now.weekday() < 4 else "Monday 9:30 AM ET"
         return {
             "is_open": False,
@@ -810,6 +829,29 @@ def get_option_chain_bulk(request: BulkOptionRequest):
 
 # ==================== SCANNER ====================
 
+def filter_expirations_by_dte(expirations: List[str], min_dte: int, max_dte: int) -> List[Tuple[str, int]]:
+    """
+    Return (expiry, dte) pairs with min_dte <= dte <= max_dte, nearest first.
+
+    Expirations are IBKR YYYYMMDD strings. They are parsed by slicing (much
+    cheaper than strptime) and the DTE window is located with bisect.
+    """
+    today_ord = date.today().toordinal()
+    by_dte = []
+    for exp in expirations:
+        try:
+            dte = date(int(exp[:4]), int(exp[4:6]), int(exp[6:8])).toordinal() - today_ord
+        except ValueError:
+            continue
+        by_dte.append((dte, exp))
+    by_dte.sort()
+
+    dtes = [dte for dte, _ in by_dte]
+    lo = bisect_left(dtes, min_dte)
+    hi = bisect_right(dtes, max_dte)
+    return [(exp, dte) for dte, exp in by_dte[lo:hi]]
+
+
 @app.post("/api/scanner/scan")
 def run_scan(request: ScanRequest):
     """
@@ -823,6 +865,8 @@ def run_scan(request: ScanRequest):
         raise HTTPException(status_code=400, detail="Not connected to IBKR")
 
     results = []
+    scored_options = []
+    scored_dtes = []
 
     for symbol in request.symbols:
         try:
@@ -835,32 +879,24 @@ def run_scan(request: ScanRequest):
             expirations = ibkr.get_option_chain_expirations(symbol)
 
             # Filter to desired DTE range
-            today = date.today()
-            valid_expirations = []
-            for exp in expirations:
-                try:
-                    exp_date = datetime.strptime(exp, '%Y%m%d').date()
-                    dte = (exp_date - today).days
-                    if request.min_dte <= dte <= request.max_dte:
-                        valid_expirations.append((exp, dte))
-                except:
-                    continue
+            valid_expirations = filter_expirations_by_dte(expirations, request.min_dte, request.max_dte)
 
             # For each valid expiration, get strikes near the money
             for exp, dte in valid_expirations[:2]:  # Limit to first 2 expirations
-                strikes = ibkr.get_option_chain_strikes(symbol, exp)
-
-                # Filter strikes to +/- 20% of current price
-                otm_strikes = [
-                    s for s in strikes
-                    if stock_price * 0.8 <= s <= stock_price * 1.2
-                ]
+                # Get a few strikes within +/- 20% of current price
+                otm_strikes = ibkr.get_option_chain_strikes(
+                    symbol,
+                    exp,
+                    price_low=stock_price * 0.8,
+                    price_high=stock_price * 1.2,
+                    limit=5
+                )
 
                 # Determine right based on strategy
                 right = 'P' if request.strategy in ['csp', 'ps'] else 'C'
 
-                # Get data for a few strikes
-                for strike in otm_strikes[:5]:
+                # Get data for each strike
+                for strike in otm_strikes:
                     option_data = ibkr.get_option_data(symbol, exp, strike, right)
                     if option_data and option_data.get('bid'):
                         # Check delta if available
@@ -870,12 +906,9 @@ def run_scan(request: ScanRequest):
                             if not (request.min_delta <= abs_delta <= request.max_delta):
                                 continue
 
-                        # Calculate simple score
-                        score = calculate_opportunity_score(
-                            option_data,
-                            stock_price,
-                            dte
-                        )
+                        # Scored in one batch once all symbols are fetched
+                        scored_options.append(option_data)
+                        scored_dtes.append(dte)
 
                         results.append({
                             'symbol': symbol,
@@ -887,58 +920,65 @@ def run_scan(request: ScanRequest):
                             'ask': option_data.get('ask'),
                             'iv': option_data.get('iv'),
                             'delta': delta,
-                            'theta': option_data.get('theta'),
-                            'score': score
+                            'theta': option_data.get('theta')
                         })
 
         except Exception as e:
             logger.error(f"Error scanning {symbol}: {e}")
             continue
 
+    # Calculate simple scores
+    scores = calculate_opportunity_scores(scored_options, scored_dtes)
+    for result, score in zip(results, scores.tolist()):
+        result['score'] = score
+
     # Sort by score descending
     results.sort(key=lambda x: x.get('score', 0), reverse=True)
 
     return {"results": results[:20]}  # Return top 20
 
 
-def calculate_opportunity_score(option_data: dict, stock_price: float, dte: int) -> int:
-    """Calculate a simple opportunity score (0-100)."""
+# Score tables for calculate_opportunity_scores. Each edges array splits a
+# metric into buckets (via np.searchsorted) and the matching scores array
+# holds the points for each bucket.
+IV_EDGES = np.array([0.3, 0.5])  # side='left': > 0.3 -> 10, > 0.5 -> 20
+IV_SCORES = np.array([0, 10, 20])
+# side='right' with inclusive upper bounds nudged up: 0.20-0.30 -> 15, 0.15-0.35 -> 10
+DELTA_EDGES = np.array([0.15, 0.20, np.nextafter(0.30, np.inf), np.nextafter(0.35, np.inf)])
+DELTA_SCORES = np.array([0, 10, 15, 10, 0])
+DTE_EDGES = np.array([21, 30, 46, 51])  # side='right': 30-45 -> 15, 21-50 -> 10
+DTE_SCORES = np.array([0, 10, 15, 10, 0])
+SPREAD_EDGES = np.array([0.05, 0.10])  # side='right': < 5% -> 10, < 10% -> 5
+SPREAD_SCORES = np.array([10, 5, 0])
+
+
+def calculate_opportunity_scores(options: List[dict], dtes: List[int]) -> np.ndarray:
+    """Calculate simple opportunity scores (0-100) for a batch of options."""
+    count = len(options)
+    # Missing values score like the falsy checks they replace; NaN IV/delta score nothing
+    iv = np.nan_to_num(np.fromiter((opt.get('iv') or 0.0 for opt in options), dtype=np.float64, count=count))
+    delta = np.nan_to_num(np.fromiter((opt.get('delta') or 0.0 for opt in options), dtype=np.float64, count=count))
+    bid = np.fromiter((opt.get('bid') or 0.0 for opt in options), dtype=np.float64, count=count)
+    ask = np.fromiter((opt.get('ask') or 0.0 for opt in options), dtype=np.float64, count=count)
+    dte = np.asarray(dtes, dtype=np.float64)
+
     score = 50  # Base score
 
     # IV boost (higher IV = more premium)
-    iv = option_data.get('iv')
-    if iv:
-        if iv > 0.5:
-            score += 20
-        elif iv > 0.3:
-            score += 10
+    score = score + IV_SCORES[np.searchsorted(IV_EDGES, iv, side='left')]
 
     # Delta scoring (prefer 0.20-0.30)
-    delta = option_data.get('delta')
-    if delta:
-        abs_delta = abs(delta)
-        if 0.20 <= abs_delta <= 0.30:
-            score += 15
-        elif 0.15 <= abs_delta <= 0.35:
-            score += 10
+    score = score + DELTA_SCORES[np.searchsorted(DELTA_EDGES, np.abs(delta), side='right')]
 
     # DTE scoring (prefer 30-45 days)
-    if 30 <= dte <= 45:
-        score += 15
-    elif 21 <= dte <= 50:
-        score += 10
+    score = score + DTE_SCORES[np.searchsorted(DTE_EDGES, dte, side='right')]
 
     # Bid/Ask spread scoring
-    bid = option_data.get('bid', 0)
-    ask = option_data.get('ask', 0)
-    if bid and ask and ask > 0:
-        spread_pct = (ask - bid) / ask
-        if spread_pct < 0.05:
-            score += 10
-        elif spread_pct < 0.10:
-            score += 5
+    quoted = (bid != 0) & (ask > 0)
+    spread_pct = (ask - bid) / np.where(quoted, ask, 1.0)
+    score = score + np.where(quoted, SPREAD_SCORES[np.searchsorted(SPREAD_EDGES, spread_pct, side='right')], 0)
 
-    return min(100, max(0, score))
+    return np.clip(score, 0, 100)
 
 
 @app.post("/api/scanner/parity-scan")
@@ -966,16 +1006,7 @@ def run_parity_scan(request: ParityScanRequest):
         expirations = ibkr.get_option_chain_expirations(request.symbol)
 
         # Filter to desired DTE range
-        today = date.today()
-        valid_expirations = []
-        for exp in expirations:
-            try:
-                exp_date = datetime.strptime(exp, '%Y%m%d').date()
-                dte = (exp_date - today).days
-                if request.min_dte <= dte <= request.max_dte:
-                    valid_expirations.append((exp, dte))
-            except:
-                continue
+        valid_expirations = filter_expirations_by_dte(expirations, request.min_dte, request.max_dte)
 
         if not valid_expirations:
             return ParityScanResponse(
@@ -995,15 +1026,18 @@ def run_parity_scan(request: ParityScanRequest):
         all_pairs = []
 
         for exp, dte in valid_expirations:
-            # Get strikes within ±20% of current price
-            strikes = ibkr.get_option_chain_strikes(request.symbol, exp)
-            nearby_strikes = [
-                s for s in strikes
-                if stock_price * 0.80 <= s <= stock_price * 1.20
-            ]
-
-            # Limit to 15 strikes per expiration
-            nearby_strikes = nearby_strikes[:15]
+            # The discount factor depends only on the expiry, so compute it
+            # once here rather than twice per strike pair
+            discount = math.exp(-request.risk_free_rate * (dte / 365.0))
+
+            # Get up to 15 strikes within ±20% of current price
+            nearby_strikes = ibkr.get_option_chain_strikes(
+                request.symbol,
+                exp,
+                price_low=stock_price * 0.80,
+                price_high=stock_price * 1.20,
+                limit=15
+            )
 
             if not nearby_strikes:
                 continue
@@ -1011,31 +1045,41 @@ def run_parity_scan(request: ParityScanRequest):
             # Bulk fetch BOTH calls AND puts for all strikes
             chain_data = ibkr.get_option_chain_bulk(request.symbol, exp, nearby_strikes)
 
-            # Group by strike to create call-put pairs
-            strike_map = {}
+            # Lay calls and puts out in parallel lists indexed by strike
+            # position rather than allocating a dict per strike
+            strike_index = {s: i for i, s in enumerate(nearby_strikes)}
+            calls = [None] * len(nearby_strikes)
+            puts = [None] * len(nearby_strikes)
             for opt in chain_data:
-                strike = opt['strike']
-                right = opt['right']
-
-                if strike not in strike_map:
-                    strike_map[strike] = {'strike': strike, 'expiry': exp, 'dte': dte}
-
-                # Calculate mid price
-                bid = opt.get('bid')
-                ask = opt.get('ask')
-                mid = (bid + ask) / 2 if bid is not None and ask is not None else None
+                idx = strike_index.get(opt['strike'])
+                if idx is None:
+                    continue
+                if opt['right'] == 'C':
+                    calls[idx] = opt
+                elif opt['right'] == 'P':
+                    puts[idx] = opt
+
+            # Create pairs where we have BOTH call and put with a usable mid
+            for strike, call, put in zip(nearby_strikes, calls, puts):
+                if call is None or put is None:
+                    continue
+                call_bid, call_ask = call.get('bid'), call.get('ask')
+                put_bid, put_ask = put.get('bid'), put.get('ask')
+                if call_bid is None or call_ask is None or put_bid is None or put_ask is None:
+                    continue
 
-                if right == 'C':
-                    strike_map[strike]['call'] = opt
-                    strike_map[strike]['call_mid'] = mid
-                elif right == 'P':
-                    strike_map[strike]['put'] = opt
-                    strike_map[strike]['put_mid'] = mid
+                call_mid = (call_bid + call_ask) * 0.5
+                put_mid = (put_bid + put_ask) * 0.5
+                if call_mid and put_mid:
+                    all_pairs.append((strike, exp, dte, discount, call, put, call_mid, put_mid))
 
-            # Create pairs where we have BOTH call and put
-            for strike, data in strike_map.items():
-                if 'call' in data and 'put' in data and data.get('call_mid') and data.get('put_mid'):
-                    all_pairs.append(data)
+        # Keep only the pairs closest to the money. Deep strikes rarely price
+        # cleanly enough to flag, and the IV stats are then taken over the
+        # analyzed pairs only; pass scan_depth to widen the window.
+        scan_depth = request.scan_depth or max(request.max_results, 0) * 3
+        if len(all_pairs) > scan_depth:
+            nearest = sorted(range(len(all_pairs)), key=lambda i: abs(stock_price - all_pairs[i][0]))
+            all_pairs = [all_pairs[i] for i in sorted(nearest[:scan_depth])]
 
         if not all_pairs:
             return ParityScanResponse(
@@ -1048,119 +1092,141 @@ def run_parity_scan(request: ParityScanRequest):
                 opportunities=[]
             )
 
-        # Calculate put-call parity violations for each pair
+        # Calculate put-call parity violations for all pairs in one batch
+        strikes, _, _, discounts, _, _, call_mids, put_mids = zip(*all_pairs)
+        parity = calculate_parity_batch(
+            strikes=strikes,
+            call_prices=call_mids,
+            put_prices=put_mids,
+            discount_factors=discounts,
+            stock_price=stock_price,
+            threshold=request.parity_threshold
+        )
+        parity = {key: values.tolist() for key, values in parity.items()}
+
+        parity_values = parity['parity_value']
+        market_spreads = parity['market_spread']
+        violations = parity['violation_dollars']
+        violation_pcts = parity['violation_pct']
+        is_violations = parity['is_violation']
+        arbitrage_types = parity['arbitrage_type']
+        synthetic_calls = parity['synthetic_call']
+        synthetic_puts = parity['synthetic_put']
+        symbol = request.symbol.upper()
+
+        # First pass: only the IV of each pair, which is all the outlier
+        # detection needs. Full opportunity dicts are built in the second pass
+        # for pairs that survive the final "violation or IV outlier" filter.
+        candidates = []
+        for i, (_, _, _, _, call_data, put_data, _, _) in enumerate(all_pairs):
+            call_iv = call_data.get('iv')
+            put_iv = put_data.get('iv')
+            candidates.append({
+                'index': i,
+                'iv': (call_iv + put_iv) / 2 if call_iv and put_iv else None
+            })
+
+        # Calculate IV statistics in a single vectorized pass
+        iv_arr = np.fromiter(
+            (cand['iv'] for cand in candidates if cand['iv'] is not None),
+            dtype=np.float64
+        )
+        iv_arr = iv_arr[~np.isnan(iv_arr)]
+        avg_iv = float(iv_arr.mean()) if iv_arr.size else 0.0
+        iv_std_dev = float(iv_arr.std(ddof=1)) if iv_arr.size > 1 else 0.0
+
+        # Detect IV outliers across all options (reuse the stats computed above)
+        outlier_stats = {'mean': avg_iv, 'std': iv_std_dev} if iv_arr.size >= 3 else {}
+        candidates = detect_statistical_outliers(
+            candidates, metric='iv', threshold=2.0, **outlier_stats
+        )
+
+        # Second pass: expand violations and IV outliers into full opportunities
         opportunities = []
 
-        for pair in all_pairs:
-            call_data = pair['call']
-            put_data = pair['put']
-            strike = pair['strike']
-            dte = pair['dte']
-            time_to_expiry = dte / 365.0
-
-            # Get prices
-            call_mid = pair['call_mid']
-            put_mid = pair['put_mid']
-
-            # Calculate put-call parity violation
-            parity_result = calculate_put_call_parity_violation(
-                call_price=call_mid,
-                put_price=put_mid,
-                stock_price=stock_price,
-                strike=strike,
-                time_to_expiry=time_to_expiry,
-                risk_free_rate=request.risk_free_rate,
-                threshold=request.parity_threshold
-            )
+        for cand in candidates:
+            i = cand['index']
+            is_violation = is_violations[i]
+            if not is_violation and not cand['is_iv_outlier']:
+                continue
 
-            # Calculate synthetic prices
-            synthetics = calculate_synthetic_prices(
-                stock_price=stock_price,
-                strike=strike,
-                time_to_expiry=time_to_expiry,
-                risk_free_rate=request.risk_free_rate,
-                call_price=call_mid,
-                put_price=put_mid
-            )
+            strike, expiry, dte, _, call_data, put_data, call_mid, put_mid = all_pairs[i]
+
+            # Read each quote field once
+            call_bid = call_data.get('bid', 0.0)
+            call_ask = call_data.get('ask', 0.0)
+            call_iv = call_data.get('iv')
+            call_volume = call_data.get('volume', 0)
+            call_delta = call_data.get('delta')
+            put_bid = put_data.get('bid', 0.0)
+            put_ask = put_data.get('ask', 0.0)
+            put_iv = put_data.get('iv')
+            put_volume = put_data.get('volume', 0)
+            put_delta = put_data.get('delta')
 
             # Prepare opportunity data
             opp = {
-                'symbol': request.symbol.upper(),
+                'symbol': symbol,
                 'strike': strike,
-                'expiry': pair['expiry'],
+                'expiry': expiry,
                 'dte': dte,
-                'call_bid': call_data.get('bid', 0.0),
-                'call_ask': call_data.get('ask', 0.0),
+                'call_bid': call_bid,
+                'call_ask': call_ask,
                 'call_mid': call_mid,
-                'call_iv': call_data.get('iv'),
-                'call_volume': call_data.get('volume', 0),
-                'put_bid': put_data.get('bid', 0.0),
-                'put_ask': put_data.get('ask', 0.0),
+                'call_iv': call_iv,
+                'call_volume': call_volume,
+                'put_bid': put_bid,
+                'put_ask': put_ask,
                 'put_mid': put_mid,
-                'put_iv': put_data.get('iv'),
-                'put_volume': put_data.get('volume', 0),
-                'parity_value': parity_result['parity_value'],
-                'market_spread': parity_result['market_spread'],
-                'violation_dollars': parity_result['violation_dollars'],
-                'violation_pct': parity_result['violation_pct'],
-                'is_violation': parity_result['is_violation'],
-                'arbitrage_type': parity_result['arbitrage_type'],
-                'synthetic_call': synthetics['synthetic_call'],
-                'synthetic_put': synthetics['synthetic_put'],
-                'avg_delta': None,
-                'iv': (call_data.get('iv', 0) + put_data.get('iv', 0)) / 2 if call_data.get('iv') and put_data.get('iv') else None
+                'put_iv': put_iv,
+                'put_volume': put_volume,
+                'parity_value': parity_values[i],
+                'market_spread': market_spreads[i],
+                'violation_dollars': violations[i],
+                'violation_pct': violation_pcts[i],
+                'is_violation': is_violation,
+                'arbitrage_type': arbitrage_types[i],
+                'synthetic_call': synthetic_calls[i],
+                'synthetic_put': synthetic_puts[i],
+                # Average delta only when both legs have it
+                'avg_delta': (abs(call_delta) + abs(put_delta)) / 2 if call_delta is not None and put_delta is not None else None,
+                'iv': cand['iv'],
+                'iv_z_score': cand['iv_z_score'],
+                'is_iv_outlier': cand['is_iv_outlier']
             }
 
-            # Calculate average delta if available
-            call_delta = call_data.get('delta')
-            put_delta = put_data.get('delta')
-            if call_delta is not None and put_delta is not None:
-                opp['avg_delta'] = (abs(call_delta) + abs(put_delta)) / 2
-
             opportunities.append(opp)
 
-        # Detect IV outliers across all options
-        opportunities = detect_statistical_outliers(opportunities, metric='iv', threshold=2.0)
-
-        # Calculate IV statistics
-        ivs = [opp['iv'] for opp in opportunities if opp.get('iv') is not None]
-        avg_iv = sum(ivs) / len(ivs) if ivs else 0.0
-
-        import math
-        if len(ivs) > 1:
-            variance = sum((x - avg_iv) ** 2 for x in ivs) / (len(ivs) - 1)
-            iv_std_dev = math.sqrt(variance)
-        else:
-            iv_std_dev = 0.0
+        # Moneyness and combined volume for every opportunity in one shot
+        count = len(opportunities)
+        strike_arr = np.fromiter((opp['strike'] for opp in opportunities), dtype=np.float64, count=count)
+        positive = strike_arr > 0
+        moneyness_arr = np.where(positive, stock_price / np.where(positive, strike_arr, 1.0), 1.0)
+        volume_arr = (
+            np.fromiter((opp['call_volume'] for opp in opportunities), dtype=np.int64, count=count)
+            + np.fromiter((opp['put_volume'] for opp in opportunities), dtype=np.int64, count=count)
+        )
 
         # Calculate opportunity scores
-        for opp in opportunities:
-            moneyness = stock_price / opp['strike'] if opp['strike'] > 0 else 1.0
-            total_volume = opp['call_volume'] + opp['put_volume']
-
-            opp['opportunity_score'] = calc_parity_opportunity_score(
-                violation_pct=opp['violation_pct'],
-                is_violation=opp['is_violation'],
-                iv_z_score=opp.get('iv_z_score', 0.0),
-                is_iv_outlier=opp.get('is_iv_outlier', False),
-                total_volume=total_volume,
-                moneyness=moneyness
-            )
-
-        # Filter to violations OR outliers
-        filtered_opportunities = [
-            opp for opp in opportunities
-            if opp['is_violation'] or opp.get('is_iv_outlier', False)
-        ]
+        scores = calc_parity_opportunity_scores(
+            violation_pct=[opp['violation_pct'] for opp in opportunities],
+            is_violation=[opp['is_violation'] for opp in opportunities],
+            iv_z_score=[opp['iv_z_score'] for opp in opportunities],
+            is_iv_outlier=[opp['is_iv_outlier'] for opp in opportunities],
+            total_volume=volume_arr,
+            moneyness=moneyness_arr
+        )
+        for opp, score in zip(opportunities, scores.tolist()):
+            opp['opportunity_score'] = score
 
         # Sort by opportunity score descending
-        filtered_opportunities.sort(key=lambda x: x['opportunity_score'], reverse=True)
+        opportunities.sort(key=lambda x: x['opportunity_score'], reverse=True)
 
         # Return top N results
-        top_opportunities = filtered_opportunities[:request.max_results]
+        top_opportunities = opportunities[:request.max_results]
 
         # Convert to Pydantic models
-        mispriced_options = [MispricedOption(**opp) for opp in top_opportunities]
+        mispriced_options = [MispricedOption.model_construct(**opp) for opp in top_opportunities]
 
         return ParityScanResponse(
             symbol=request.symbol.upper(),
@@ -1200,12 +1266,31 @@ def get_performance_open_positions():
 
 # ==================== PORTFOLIO SUMMARY ====================
 
+# The dashboard summary and the AI context both read the same three queries;
+# keep the results for a moment so back-to-back requests share them.
+PORTFOLIO_SNAPSHOT_TTL = 2.0
+_PORTFOLIO_SNAPSHOT = {'ts': 0.0, 'value': None}
+
+
+def get_portfolio_snapshot() -> Tuple[List[Dict], List[Dict], Dict]:
+    """
+    Return (open positions, stock holdings, performance stats), cached briefly.
+
+    The returned objects are shared between callers and must not be mutated.
+    """
+    if _PORTFOLIO_SNAPSHOT['ts'] and monotonic() - _PORTFOLIO_SNAPSHOT['ts'] < PORTFOLIO_SNAPSHOT_TTL:
+        return _PORTFOLIO_SNAPSHOT['value']
+
+    value = (get_open_positions(), get_stock_holdings(), get_performance_stats())
+    _PORTFOLIO_SNAPSHOT['value'] = value
+    _PORTFOLIO_SNAPSHOT['ts'] = monotonic()
+    return value
+
+
 @app.get("/api/portfolio/summary")
 def get_portfolio_summary():
     """Get portfolio summary combining positions and holdings."""
-    positions = get_open_positions()
-    holdings = get_stock_holdings()
-    stats = get_performance_stats()
+    positions, holdings, stats = get_portfolio_snapshot()
 
     # Calculate totals
     total_premium = sum(p['premium_collected'] * p['quantity'] * 100 for p in positions)
@@ -1245,6 +1330,7 @@ def list_wheel_chains():
 def create_wheel_chain_endpoint(data: WheelChainCreate):
     """Create a new wheel chain."""
     chain_id = db_create_wheel_chain(data.underlying)
+    _invalidate_portfolio_ctx()
     chain = get_wheel_chain_by_id(chain_id)
     return {"id": chain_id, "chain": chain, "message": "Wheel chain created"}
 
@@ -1264,6 +1350,7 @@ def delete_wheel_chain_endpoint(chain_id: str):
     success = delete_wheel_chain(chain_id)
     if not success:
         raise HTTPException(status_code=404, detail="Wheel chain not found")
+    _invalidate_portfolio_ctx()
     return {"message": "Wheel chain deleted"}
 
 
@@ -1303,6 +1390,8 @@ def record_assignment(chain_id: str, data: WheelChainAssignment):
     if not success:
         raise HTTPException(status_code=500, detail="Failed to record assignment")
 
+    _invalidate_portfolio_ctx()
+
     updated_chain = get_wheel_chain_by_id(chain_id)
     return {"message": "Assignment recorded", "chain": updated_chain}
 
@@ -1330,6 +1419,8 @@ def record_exit(chain_id: str, data: WheelChainExit):
     if not success:
         raise HTTPException(status_code=500, detail="Failed to record exit")
 
+    _invalidate_portfolio_ctx()
+
     updated_chain = get_wheel_chain_by_id(chain_id)
     return {"message": "Exit recorded", "chain": updated_chain}
 
@@ -1356,6 +1447,8 @@ def link_position_to_chain_endpoint(position_id: int, chain_id: str):
     if not success:
         raise HTTPException(status_code=500, detail="Failed to link position to chain")
 
+    _invalidate_portfolio_ctx()
+
     return {"message": "Position linked to chain"}
 
 
@@ -1373,6 +1466,8 @@ def unlink_position_from_chain_endpoint(position_id: int):
     if not success:
         raise HTTPException(status_code=500, detail="Failed to unlink position from chain")
 
+    _invalidate_portfolio_ctx()
+
     return {"message": "Position unlinked from chain"}
 
 
@@ -1526,11 +1621,24 @@ def get_setting_value(key: str):
 
 # ==================== AI CHAT ====================
 
+# Portfolio context is rebuilt from three DB queries; cache it briefly so a
+# multi-turn chat doesn't repeat that work on every message.
+PORTFOLIO_CTX_TTL = 5.0
+_PORTFOLIO_CTX = {'ts': 0.0, 'value': ''}
+
+
+def _invalidate_portfolio_ctx():
+    """Drop the cached portfolio context and snapshot after positions or holdings change."""
+    _PORTFOLIO_CTX['ts'] = 0.0
+    _PORTFOLIO_SNAPSHOT['ts'] = 0.0
+
+
 def get_portfolio_context() -> str:
     """Build context about user's portfolio for the AI."""
-    positions = get_open_positions()
-    holdings = get_stock_holdings()
-    stats = get_performance_stats()
+    if _PORTFOLIO_CTX['ts'] and monotonic() - _PORTFOLIO_CTX['ts'] < PORTFOLIO_CTX_TTL:
+        return _PORTFOLIO_CTX['value']
+
+    positions, holdings, stats = get_portfolio_snapshot()
 
     context_parts = ["Current Portfolio Context:"]
 
@@ -1561,19 +1669,36 @@ def get_portfolio_context() -> str:
     context_parts.append(f"- Win rate: {stats.get('win_rate', 0):.1f}%")
     context_parts.append(f"- Realized P&L: ${stats.get('total_realized_pnl', 0):.2f}")
 
-    return "\n".join(context_parts)
+    value = "\n".join(context_parts)
+    _PORTFOLIO_CTX['value'] = value
+    _PORTFOLIO_CTX['ts'] = monotonic()
+    return value
+
+
+def _ai_system_prompt() -> str:
+    """System prompt for the advisor, including the current portfolio context."""
+    return f"{AI_SYSTEM_PROMPT}\n\n{get_portfolio_context()}"
+
+
+def _gemini_contents(messages: List[ChatMessage]) -> List[dict]:
+    """Convert chat messages to Gemini's contents format."""
+    return [
+        {"role": "user" if msg.role == "user" else "model", "parts": [{"text": msg.content}]}
+        for msg in messages
+    ]
+
+
+def _chat_messages(messages: List[ChatMessage], system: Optional[str] = None) -> List[dict]:
+    """Convert chat messages to role/content dicts, optionally led by a system message."""
+    chat_messages = [{"role": "system", "content": system}] if system else []
+    chat_messages.extend({"role": msg.role, "content": msg.content} for msg in messages)
+    return chat_messages
 
 
 async def call_google_ai(messages: List[ChatMessage], api_key: str, model: str = "gemini-2.0-flash-exp") -> str:
     """Call Google Gemini API."""
-    portfolio_context = get_portfolio_context()
-    full_system = f"{AI_SYSTEM_PROMPT}\n\n{portfolio_context}"
-
-    # Convert messages to Gemini format
-    contents = []
-    for msg in messages:
-        role = "user" if msg.role == "user" else "model"
-        contents.append({"role": role, "parts": [{"text": msg.content}]})
+    full_system = _ai_system_prompt()
+    contents = _gemini_contents(messages)
 
     async with httpx.AsyncClient() as client:
         response = await client.post(
@@ -1598,13 +1723,8 @@ async def call_google_ai(messages: List[ChatMessage], api_key: str, model: str =
 
 async def call_anthropic_ai(messages: List[ChatMessage], api_key: str, model: str = "claude-3-5-sonnet-20241022") -> str:
     """Call Anthropic Claude API."""
-    portfolio_context = get_portfolio_context()
-    full_system = f"{AI_SYSTEM_PROMPT}\n\n{portfolio_context}"
-
-    # Convert messages to Anthropic format
-    anthropic_messages = []
-    for msg in messages:
-        anthropic_messages.append({"role": msg.role, "content": msg.content})
+    full_system = _ai_system_prompt()
+    anthropic_messages = _chat_messages(messages)
 
     async with httpx.AsyncClient() as client:
         response = await client.post(
@@ -1632,13 +1752,7 @@ async def call_anthropic_ai(messages: List[ChatMessage], api_key: str, model: st
 
 async def call_openai_ai(messages: List[ChatMessage], api_key: str, model: str = "gpt-4o") -> str:
     """Call OpenAI API."""
-    portfolio_context = get_portfolio_context()
-    full_system = f"{AI_SYSTEM_PROMPT}\n\n{portfolio_context}"
-
-    # Convert messages to OpenAI format
-    openai_messages = [{"role": "system", "content": full_system}]
-    for msg in messages:
-        openai_messages.append({"role": msg.role, "content": msg.content})
+    openai_messages = _chat_messages(messages, _ai_system_prompt())
 
     async with httpx.AsyncClient() as client:
         response = await client.post(
@@ -1665,13 +1779,7 @@ async def call_openai_ai(messages: List[ChatMessage], api_key: str, model: str =
 
 async def call_xai_ai(messages: List[ChatMessage], api_key: str, model: str = "grok-2") -> str:
     """Call xAI Grok API."""
-    portfolio_context = get_portfolio_context()
-    full_system = f"{AI_SYSTEM_PROMPT}\n\n{portfolio_context}"
-
-    # Convert messages to xAI format (OpenAI compatible)
-    xai_messages = [{"role": "system", "content": full_system}]
-    for msg in messages:
-        xai_messages.append({"role": msg.role, "content": msg.content})
+    xai_messages = _chat_messages(messages, _ai_system_prompt())
 
     async with httpx.AsyncClient() as client:
         response = await client.post(
@@ -1698,13 +1806,7 @@ async def call_xai_ai(messages: List[ChatMessage], api_key: str, model: str = "g
 
 async def call_perplexity_ai(messages: List[ChatMessage], api_key: str, model: str = "llama-3.1-sonar-large-128k-online") -> str:
     """Call Perplexity API."""
-    portfolio_context = get_portfolio_context()
-    full_system = f"{AI_SYSTEM_PROMPT}\n\n{portfolio_context}"
-
-    # Convert messages to Perplexity format (OpenAI compatible)
-    pplx_messages = [{"role": "system", "content": full_system}]
-    for msg in messages:
-        pplx_messages.append({"role": msg.role, "content": msg.content})
+    pplx_messages = _chat_messages(messages, _ai_system_prompt())
 
     async with httpx.AsyncClient() as client:
         response = await client.post(
@@ -1729,6 +1831,213 @@ async def call_perplexity_ai(messages: List[ChatMessage], api_key: str, model: s
         return data["choices"][0]["message"]["content"]
 
 
+async def call_first_available(
+    messages: List[ChatMessage],
+    providers: List[Tuple[str, str, Optional[str]]]
+) -> Tuple[str, str, str]:
+    """
+    Query several AI providers concurrently and return the first good reply.
+
+    Args:
+        messages: Chat history to send
+        providers: (provider, api_key, model) tuples, primary first. A model
+            of None uses the provider's default.
+
+    Returns:
+        (response, provider, model) of the first call that succeeded.
+        The remaining calls are cancelled. If every call fails, the
+        primary provider's error is raised.
+    """
+    tasks = {}
+    for provider, api_key, model in providers:
+        func, _, default_model = AI_PROVIDERS[provider]
+        model = model or default_model
+        task = asyncio.create_task(func(messages, api_key, model))
+        tasks[task] = (provider, model)
+
+    errors = {}
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                provider, model = tasks[task]
+                if task.exception() is None:
+                    return task.result(), provider, model
+                logger.warning(f"AI provider {provider} failed: {task.exception()}")
+                errors[provider] = task.exception()
+    finally:
+        for task in pending:
+            task.cancel()
+
+    raise errors[providers[0][0]]
+
+
+# ---- Streaming variants ----
+# These yield text deltas as the provider generates them, so the client can
+# render the reply as it arrives instead of waiting for the full response.
+
+async def _iter_sse_data(response: httpx.Response) -> AsyncIterator[dict]:
+    """Yield the parsed JSON payload of each server-sent event from a provider."""
+    async for line in response.aiter_lines():
+        if not line.startswith("data:"):
+            continue
+        payload = line[5:].strip()
+        if not payload or payload == "[DONE]":
+            continue
+        try:
+            yield json.loads(payload)
+        except json.JSONDecodeError:
+            continue
+
+
+async def stream_google_ai(messages: List[ChatMessage], api_key: str, model: str = "gemini-2.0-flash-exp") -> AsyncIterator[str]:
+    """Stream a Google Gemini response."""
+    full_system = _ai_system_prompt()
+    contents = _gemini_contents(messages)
+
+    async with httpx.AsyncClient() as client:
+        async with client.stream(
+            "POST",
+            f"https://generativelanguage.googleapis.com/v1beta/models/{model}:streamGenerateContent?alt=sse&key={api_key}",
+            json={
+                "contents": contents,
+                "systemInstruction": {"parts": [{"text": full_system}]},
+                "generationConfig": {
+                    "temperature": 0.7,
+                    "maxOutputTokens": 2048,
+                }
+            },
+            timeout=60.0
+        ) as response:
+            if response.status_code != 200:
+                await response.aread()
+                raise HTTPException(status_code=500, detail=f"Google AI error: {response.text}")
+
+            async for event in _iter_sse_data(response):
+                candidates = event.get("candidates") or [{}]
+                for part in candidates[0].get("content", {}).get("parts", []):
+                    if part.get("text"):
+                        yield part["text"]
+
+
+async def stream_anthropic_ai(messages: List[ChatMessage], api_key: str, model: str = "claude-3-5-sonnet-20241022") -> AsyncIterator[str]:
+    """Stream an Anthropic Claude response."""
+    full_system = _ai_system_prompt()
+    anthropic_messages = _chat_messages(messages)
+
+    async with httpx.AsyncClient() as client:
+        async with client.stream(
+            "POST",
+            "https://api.anthropic.com/v1/messages",
+            headers={
+                "x-api-key": api_key,
+                "anthropic-version": "2023-06-01",
+                "content-type": "application/json"
+            },
+            json={
+                "model": model,
+                "max_tokens": 2048,
+                "system": full_system,
+                "messages": anthropic_messages,
+                "stream": True
+            },
+            timeout=60.0
+        ) as response:
+            if response.status_code != 200:
+                await response.aread()
+                raise HTTPException(status_code=500, detail=f"Anthropic error: {response.text}")
+
+            async for event in _iter_sse_data(response):
+                if event.get("type") == "content_block_delta":
+                    text = event.get("delta", {}).get("text")
+                    if text:
+                        yield text
+                elif event.get("type") == "error":
+                    raise HTTPException(status_code=500, detail=f"Anthropic error: {event.get('error')}")
+
+
+async def stream_openai_compatible_ai(
+    url: str,
+    provider_name: str,
+    messages: List[ChatMessage],
+    api_key: str,
+    model: str
+) -> AsyncIterator[str]:
+    """Stream a response from an OpenAI-compatible chat API (OpenAI, xAI, Perplexity)."""
+    chat_messages = _chat_messages(messages, _ai_system_prompt())
+
+    async with httpx.AsyncClient() as client:
+        async with client.stream(
+            "POST",
+            url,
+            headers={
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json"
+            },
+            json={
+                "model": model,
+                "messages": chat_messages,
+                "max_tokens": 2048,
+                "temperature": 0.7,
+                "stream": True
+            },
+            timeout=60.0
+        ) as response:
+            if response.status_code != 200:
+                await response.aread()
+                raise HTTPException(status_code=500, detail=f"{provider_name} error: {response.text}")
+
+            async for event in _iter_sse_data(response):
+                choices = event.get("choices") or [{}]
+                text = (choices[0].get("delta") or {}).get("content")
+                if text:
+                    yield text
+
+
+# Provider name -> (call function, stream function, default model)
+AI_PROVIDERS = {
+    "google": (call_google_ai, stream_google_ai, "gemini-2.0-flash-exp"),
+    "anthropic": (call_anthropic_ai, stream_anthropic_ai, "claude-3-5-sonnet-20241022"),
+    "openai": (
+        call_openai_ai,
+        partial(stream_openai_compatible_ai, "https://api.openai.com/v1/chat/completions", "OpenAI"),
+        "gpt-4o",
+    ),
+    "xai": (
+        call_xai_ai,
+        partial(stream_openai_compatible_ai, "https://api.x.ai/v1/chat/completions", "xAI"),
+        "grok-2",
+    ),
+    "perplexity": (
+        call_perplexity_ai,
+        partial(stream_openai_compatible_ai, "https://api.perplexity.ai/chat/completions", "Perplexity"),
+        "llama-3.1-sonar-large-128k-online",
+    ),
+}
+
+
+def _ai_provider_chain(
+    provider: str,
+    api_key: str,
+    model: Optional[str]
+) -> List[Tuple[str, str, Optional[str]]]:
+    """
+    Build the (provider, api_key, model) list for a chat request.
+
+    The primary provider comes first, followed by the comma-separated
+    `ai_fallback_providers` setting. Fallbacks without an API key, unknown
+    names and duplicates are skipped; they use their default model.
+    """
+    providers = [(provider, api_key, model)]
+    for fallback in (get_setting("ai_fallback_providers") or "").split(","):
+        fallback = fallback.strip()
+        fallback_key = get_setting(f"{fallback}_api_key") if fallback in AI_PROVIDERS else None
+        if fallback_key and all(fallback != p for p, _, _ in providers):
+            providers.append((fallback, fallback_key, None))
+    return providers
+
+
 @app.post("/api/chat")
 async def chat(request: ChatRequest):
     """Send a message to the AI advisor."""
@@ -1742,19 +2051,18 @@ async def chat(request: ChatRequest):
             detail=f"No API key configured for {provider}. Please add your API key in Settings."
         )
 
+    if provider not in AI_PROVIDERS:
+        raise HTTPException(status_code=400, detail=f"Unknown provider: {provider}")
+
+    # Optional failover: configured fallbacks are raced alongside the primary
+    providers = _ai_provider_chain(provider, api_key, model)
+
     try:
-        if provider == "google":
-            response = await call_google_ai(request.messages, api_key, model or "gemini-2.0-flash-exp")
-        elif provider == "anthropic":
-            response = await call_anthropic_ai(request.messages, api_key, model or "claude-3-5-sonnet-20241022")
-        elif provider == "openai":
-            response = await call_openai_ai(request.messages, api_key, model or "gpt-4o")
-        elif provider == "xai":
-            response = await call_xai_ai(request.messages, api_key, model or "grok-2")
-        elif provider == "perplexity":
-            response = await call_perplexity_ai(request.messages, api_key, model or "llama-3.1-sonar-large-128k-online")
+        if len(providers) > 1:
+            response, provider, model = await call_first_available(request.messages, providers)
         else:
-            raise HTTPException(status_code=400, detail=f"Unknown provider: {provider}")
+            func, _, default_model = AI_PROVIDERS[provider]
+            response = await func(request.messages, api_key, model or default_model)
 
         return {"response": response, "provider": provider, "model": model}
 
@@ -1765,8 +2073,111 @@ async def chat(request: ChatRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Stream the AI advisor's reply as server-sent events.
+
+    Emits `data: {"delta": "..."}` events as text is generated, followed by
+    `data: {"done": true, ...}` on completion or `data: {"error": "..."}`.
+    Configured fallback providers take over if the primary fails before
+    streaming anything.
+    """
+    provider = get_setting("ai_provider") or "google"
+    model = get_setting("ai_model")
+    api_key = get_setting(f"{provider}_api_key")
+
+    if not api_key:
+        raise HTTPException(
+            status_code=400,
+            detail=f"No API key configured for {provider}. Please add your API key in Settings."
+        )
+
+    if provider not in AI_PROVIDERS:
+        raise HTTPException(status_code=400, detail=f"Unknown provider: {provider}")
+
+    providers = _ai_provider_chain(provider, api_key, model)
+
+    async def event_stream():
+        # Providers are tried in order. Once a delta has been sent the reply
+        # is committed to that provider, so only failures before the first
+        # delta move on to the next fallback.
+        for index, (name, key, model_name) in enumerate(providers):
+            _, stream_func, default_model = AI_PROVIDERS[name]
+            model_name = model_name or default_model
+            started = False
+            try:
+                async for delta in stream_func(request.messages, key, model_name):
+                    started = True
+                    yield f"data: {json.dumps({'delta': delta})}\n\n"
+                yield f"data: {json.dumps({'done': True, 'provider': name, 'model': model_name})}\n\n"
+                return
+            except Exception as e:
+                if not started and index + 1 < len(providers):
+                    logger.warning(f"AI provider {name} failed, trying next: {e}")
+                    continue
+                if isinstance(e, httpx.TimeoutException):
+                    error = 'AI request timed out. Please try again.'
+                elif isinstance(e, HTTPException):
+                    logger.error(f"Chat stream error: {e.detail}")
+                    error = e.detail
+                else:
+                    logger.error(f"Chat stream error: {e}")
+                    error = str(e)
+                yield f"data: {json.dumps({'error': error})}\n\n"
+                return
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
+
+
 # ==================== CSV IMPORT ====================
 
+# Column positions in an IBKR Activity Statement "Trades" row:
+# Trades,Data,Order,Equity and Index Options,USD,Account,Symbol,DateTime,Qty,T. Price,...,Code
+_COL_SECTION = 0
+_COL_ROW_TYPE = 1
+_COL_ASSET = 3
+_COL_SYMBOL = 6
+_COL_DATETIME = 7
+_COL_QUANTITY = 8
+_COL_PRICE = 9
+_COL_PROCEEDS = 11
+_COL_COMMISSION = 12
+_COL_CODE = 16
+
+# Raw line prefixes of trade data rows (plain and fully quoted exports)
+_TRADE_ROW_PREFIXES = ('Trades,Data,', '"Trades","Data",')
+
+
+class Trade(NamedTuple):
+    """One option trade row from an IBKR Activity Statement."""
+    symbol: str
+    datetime: str
+    quantity: int
+    trade_price: float
+    proceeds: float
+    commission: float
+    code: str
+    is_open: bool
+    is_close: bool
+    is_expired: bool
+
+
+# IBKR timestamps ("2025-10-10, 12:38:13") sort correctly as strings
+_TRADE_SORT_KEY = attrgetter('datetime')
+
+_MONTH_MAP = {
+    "JAN": 1, "FEB": 2, "MAR": 3, "APR": 4, "MAY": 5, "JUN": 6,
+    "JUL": 7, "AUG": 8, "SEP": 9, "OCT": 10, "NOV": 11, "DEC": 12
+}
+
+
+# Symbols and timestamps repeat across a statement's opens and closes
+@lru_cache(maxsize=4096)
 def parse_ibkr_option_symbol(symbol: str) -> Tuple[str, str, float, str]:
     """
     Parse IBKR option symbol format: "TSLA 17OCT25 410 P"
@@ -1782,31 +2193,25 @@ def parse_ibkr_option_symbol(symbol: str) -> Tuple[str, str, float, str]:
     option_type = "PUT" if parts[3] == "P" else "CALL"
 
     # Parse expiry: 17OCT25 → 2025-10-17
-    month_map = {
-        "JAN": 1, "FEB": 2, "MAR": 3, "APR": 4, "MAY": 5, "JUN": 6,
-        "JUL": 7, "AUG": 8, "SEP": 9, "OCT": 10, "NOV": 11, "DEC": 12
-    }
-
     day = int(expiry_str[:2])
-    month_str = expiry_str[2:5].upper()
+    month = _MONTH_MAP.get(expiry_str[2:5].upper())
     year = 2000 + int(expiry_str[5:7])
 
-    if month_str not in month_map:
+    if month is None:
         raise ValueError(f"Invalid month in expiry: {expiry_str}")
 
-    month = month_map[month_str]
     expiry_date = f"{year}-{month:02d}-{day:02d}"
 
     return underlying, expiry_date, strike, option_type
 
 
+@lru_cache(maxsize=4096)
 def parse_ibkr_datetime(datetime_str: str) -> str:
     """
     Parse IBKR datetime format: "2025-10-10, 12:38:13" → "2025-10-10"
     """
     # Extract just the date part
-    date_part = datetime_str.split(",")[0].strip()
-    return date_part
+    return datetime_str.partition(",")[0].strip()
 
 
 @app.post("/api/import/ibkr-trades")
@@ -1826,143 +2231,150 @@ async def import_ibkr_trades(
     if not file.filename.endswith('.csv'):
         raise HTTPException(status_code=400, detail="File must be a CSV")
 
+    # Parsing and DB writes are blocking; keep them off the event loop
+    return await run_in_threadpool(_do_import, file.file, file.filename, clear_existing)
+
+
+def _do_import(upload: BinaryIO, filename: str, clear_existing: bool) -> dict:
+    """Parse an IBKR statement, match trades and save the positions."""
     # Clear existing positions if requested
     cleared = 0
     if clear_existing:
         cleared = clear_all_positions()
-        logger.info(f"Cleared {cleared} existing positions before import")
-
+        # Drop cached portfolio data now in case the import fails below
+        _invalidate_portfolio_ctx()
+        logger.info("Cleared %d existing positions before import", cleared)
+
+    # Stream the CSV and keep only option trades, grouped by symbol. The
+    # upload is decoded as it is read rather than loaded into memory first.
+    # Lines from other statement sections are dropped before the csv parser
+    # sees them; the field checks below still decide which rows are trades.
+    # codecs' reader works on any binary file object (SpooledTemporaryFile
+    # only became usable with io.TextIOWrapper in Python 3.11).
+    text = codecs.getreader('utf-8')(upload)
+    reader = csv.reader(line for line in text if line.startswith(_TRADE_ROW_PREFIXES))
+    trades_by_symbol: Dict[str, List[Trade]] = {}
     try:
-        content = await file.read()
-        text = content.decode('utf-8')
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Could not read file: {e}")
-
-    # Parse CSV
-    reader = csv.reader(io.StringIO(text))
-    rows = list(reader)
-
-    # Find option trades
-    # Format: Trades,Data,Order,Equity and Index Options,USD,Account,Symbol,DateTime,Qty,...,Code
-    option_trades = []
-    for row in rows:
-        if len(row) < 17:
-            continue
-        if row[0] == "Trades" and row[1] == "Data" and row[3] == "Equity and Index Options":
+        for row in reader:
+            if (len(row) <= _COL_CODE or row[_COL_SECTION] != "Trades" or row[_COL_ROW_TYPE] != "Data"
+                    or row[_COL_ASSET] != "Equity and Index Options"):
+                continue
             try:
-                trade = {
-                    'symbol': row[6],
-                    'datetime': row[7],
-                    'quantity': int(row[8]),
-                    'trade_price': float(row[9]),
-                    'proceeds': float(row[11]) if row[11] else 0,
-                    'commission': float(row[12]) if row[12] else 0,
-                    'code': row[16] if len(row) > 16 else ''
-                }
-                option_trades.append(trade)
-            except (ValueError, IndexError) as e:
-                logger.warning(f"Could not parse trade row: {row}, error: {e}")
+                proceeds = row[_COL_PROCEEDS]
+                commission = row[_COL_COMMISSION]
+                code = row[_COL_CODE]
+                # Classify once here; 'in' checks handle compound codes like 'C;Ep'
+                is_expired = 'Ep' in code
+                trade = Trade(
+                    symbol=row[_COL_SYMBOL],
+                    datetime=row[_COL_DATETIME],
+                    quantity=int(row[_COL_QUANTITY]),
+                    trade_price=float(row[_COL_PRICE]),
+                    proceeds=float(proceeds) if proceeds else 0,
+                    commission=float(commission) if commission else 0,
+                    code=code,
+                    is_open='O' in code,
+                    is_close=is_expired or 'C' in code,
+                    is_expired=is_expired
+                )
+            except ValueError as e:
+                logger.warning("Could not parse trade row: %s, error: %s", row, e)
                 continue
+            trades_by_symbol.setdefault(trade.symbol, []).append(trade)
+    except UnicodeDecodeError as e:
+        raise HTTPException(status_code=400, detail=f"Could not read file: {e}")
 
-    if not option_trades:
+    if not trades_by_symbol:
         raise HTTPException(
             status_code=400,
             detail="No option trades found in CSV. Make sure this is an IBKR Activity Statement."
         )
 
-    # Group trades by symbol and match opens with closes
-    trades_by_symbol: Dict[str, List[dict]] = {}
-    for trade in option_trades:
-        symbol = trade['symbol']
-        if symbol not in trades_by_symbol:
-            trades_by_symbol[symbol] = []
-        trades_by_symbol[symbol].append(trade)
-
-    # Process each symbol's trades
+    # Process each symbol's trades, queueing rows for a bulk insert
     imported = 0
     skipped = 0
-    errors = []
+    errors: List[Tuple[str, str]] = []  # (label, message), formatted once at the end
+    open_rows = []
+    closed_rows = []
 
     for symbol, trades in trades_by_symbol.items():
         # Sort by datetime
-        trades.sort(key=lambda t: t['datetime'])
+        trades.sort(key=_TRADE_SORT_KEY)
 
-        # Separate opens (O) and closes (C, Ep)
-        # Use 'in' check to handle compound codes like 'C;Ep'
-        opens = [t for t in trades if 'O' in t['code']]
-        closes = [t for t in trades if 'C' in t['code'] or 'Ep' in t['code']]
+        # Separate opens (O) and closes (C, Ep), bucketing closes by quantity
+        opens = []
+        close_buckets: Dict[int, deque] = defaultdict(deque)
+        for t in trades:
+            if t.is_open:
+                opens.append(t)
+            if t.is_close:
+                close_buckets[t.quantity].append(t)
 
         # Match opens with closes (simple FIFO matching)
         for open_trade in opens:
-            # Find a matching close (same quantity, opposite sign)
-            matching_close = None
-            for close_trade in closes:
-                if close_trade['quantity'] == -open_trade['quantity']:
-                    matching_close = close_trade
-                    closes.remove(close_trade)
-                    break
+            # Take the earliest close with the same quantity and opposite sign
+            bucket = close_buckets.get(-open_trade.quantity)
+            matching_close = bucket.popleft() if bucket else None
 
             if not matching_close:
                 # No matching close found - this is an open position, import it as OPEN
                 try:
                     underlying, expiry, strike, option_type = parse_ibkr_option_symbol(symbol)
-                    open_date = parse_ibkr_datetime(open_trade['datetime'])
-                    premium_per_share = open_trade['trade_price']
+                    open_date = parse_ibkr_datetime(open_trade.datetime)
+                    premium_per_share = open_trade.trade_price
                     strategy_type = 'CSP' if option_type == 'PUT' else 'NAKED'
                     notes = "Imported from IBKR CSV - Open position"
 
-                    # Create position as OPEN
-                    position_id = create_position(
+                    # Queue position as OPEN
+                    open_rows.append(dict(
                         underlying=underlying,
                         option_type=option_type,
                         strike=strike,
                         expiry=expiry,
-                        quantity=abs(open_trade['quantity']),
+                        quantity=abs(open_trade.quantity),
                         premium_collected=premium_per_share,
                         strategy_type=strategy_type,
                         open_date=open_date,
                         notes=notes
-                    )
-                    imported += 1
-                    logger.info(f"Imported OPEN: {underlying} ${strike} {option_type} {expiry}")
+                    ))
                 except Exception as e:
-                    errors.append(f"{symbol} (open): {str(e)}")
-                    logger.error(f"Error importing open position {symbol}: {e}")
+                    errors.append((f"{symbol} (open)", str(e)))
+                    logger.error("Error importing open position %s: %s", symbol, e)
                 continue
 
             try:
                 # Parse the symbol
                 underlying, expiry, strike, option_type = parse_ibkr_option_symbol(symbol)
-                open_date = parse_ibkr_datetime(open_trade['datetime'])
-                close_date = parse_ibkr_datetime(matching_close['datetime'])
+                open_date = parse_ibkr_datetime(open_trade.datetime)
+                close_date = parse_ibkr_datetime(matching_close.datetime)
 
                 # Calculate premium and close price
                 # Open trade: quantity is negative for sell, price is per share
-                premium_per_share = open_trade['trade_price']
+                premium_per_share = open_trade.trade_price
                 # For expired positions (code contains 'Ep'), close price is 0
-                close_price = matching_close['trade_price'] if 'C' in matching_close['code'] and 'Ep' not in matching_close['code'] else 0
+                close_price = 0 if matching_close.is_expired else matching_close.trade_price
 
                 # Determine status
-                status = 'EXPIRED' if 'Ep' in matching_close['code'] else 'CLOSED'
+                status = 'EXPIRED' if matching_close.is_expired else 'CLOSED'
 
                 # Determine strategy (CSP for puts, assume naked for calls unless we know holdings)
                 strategy_type = 'CSP' if option_type == 'PUT' else 'NAKED'
 
                 # Calculate realized P/L for notes
                 # P/L = (open proceeds + close proceeds) - total commission
-                total_proceeds = open_trade['proceeds'] + matching_close['proceeds']
-                total_commission = abs(open_trade['commission']) + abs(matching_close['commission'])
+                total_proceeds = open_trade.proceeds + matching_close.proceeds
+                total_commission = abs(open_trade.commission) + abs(matching_close.commission)
                 realized_pnl = total_proceeds - total_commission
 
                 notes = f"Imported from IBKR CSV. P/L: ${realized_pnl:.2f}"
 
-                # Create the closed position
-                position_id = create_closed_position(
+                # Queue the closed position
+                closed_rows.append(dict(
                     underlying=underlying,
                     option_type=option_type,
                     strike=strike,
                     expiry=expiry,
-                    quantity=abs(open_trade['quantity']),
+                    quantity=abs(open_trade.quantity),
                     premium_collected=premium_per_share,
                     strategy_type=strategy_type,
                     open_date=open_date,
@@ -1970,22 +2382,41 @@ async def import_ibkr_trades(
                     close_price=close_price,
                     status=status,
                     notes=notes
-                )
-
-                imported += 1
-                logger.info(f"Imported: {underlying} ${strike} {option_type} {expiry} - {status}")
+                ))
 
             except Exception as e:
-                errors.append(f"{symbol}: {str(e)}")
-                logger.error(f"Error importing {symbol}: {e}")
+                errors.append((symbol, str(e)))
+                logger.error("Error importing %s: %s", symbol, e)
+
+    # Write all imported positions in one transaction
+    try:
+        imported += create_imported_positions_bulk(open_rows, closed_rows)
+    except Exception as e:
+        errors.append(("Database error", str(e)))
+        logger.error("Error saving imported positions: %s", e)
+    else:
+        for row in open_rows:
+            logger.info("Imported OPEN: %s $%s %s %s",
+                        row['underlying'], row['strike'], row['option_type'], row['expiry'])
+        for row in closed_rows:
+            logger.info("Imported: %s $%s %s %s - %s",
+                        row['underlying'], row['strike'], row['option_type'], row['expiry'], row['status'])
 
     message = f"Successfully imported {imported} trades (including open positions)."
     if cleared > 0:
         message = f"Cleared {cleared} existing positions. " + message
 
+    _invalidate_portfolio_ctx()
+
+    # Collapse repeated errors (e.g. one bad symbol traded many times)
+    errors = [
+        f"{label}: {msg}" if count == 1 else f"{label}: {msg} (x{count})"
+        for (label, msg), count in Counter(errors).items()
+    ]
+
     # Record this import in history
     record_import(
-        filename=file.filename,
+        filename=filename,
         trades_imported=imported,
         trades_skipped=skipped,
         errors=errors if errors else None
@@ -16,10 +16,17 @@ Where:
 """
 
 import math
-from typing import List, Dict, Optional
+from functools import lru_cache
+from typing import List, Dict, Optional, Sequence
 import numpy as np
 
 
+@lru_cache(maxsize=1024)
+def _discount(risk_free_rate: float, time_to_expiry: float) -> float:
+    """e^(-rT), cached since every strike of an expiry shares the same (r, T)."""
+    return math.exp(-risk_free_rate * time_to_expiry)
+
+
 def calculate_put_call_parity_violation(
     call_price: float,
     put_price: float,
@@ -27,7 +34,8 @@ def calculate_put_call_parity_violation(
     strike: float,
     time_to_expiry: float,
     risk_free_rate: float,
-    threshold: float = 0.02
+    threshold: float = 0.02,
+    discount_factor: Optional[float] = None
 ) -> Dict:
     """
     Detect put-call parity violations.
@@ -40,6 +48,8 @@ def calculate_put_call_parity_violation(
         time_to_expiry: Time to expiration in years
         risk_free_rate: Annual risk-free rate (e.g., 0.045 for 4.5%)
         threshold: Violation threshold as percentage (default 0.02 = 2%)
+        discount_factor: Precomputed e^(-rT) (optional). It only depends on
+            the expiry, so callers scanning many strikes can compute it once.
 
     Returns:
         Dictionary containing:
@@ -51,7 +61,8 @@ def calculate_put_call_parity_violation(
         - arbitrage_type: 'call_overpriced' | 'put_overpriced' | 'no_violation'
     """
     # Calculate theoretical parity value: S - K*e^(-rT)
-    discount_factor = math.exp(-risk_free_rate * time_to_expiry)
+    if discount_factor is None:
+        discount_factor = _discount(risk_free_rate, time_to_expiry)
     parity_value = stock_price - (strike * discount_factor)
 
     # Calculate actual market spread: C - P
@@ -89,7 +100,8 @@ def calculate_synthetic_prices(
     time_to_expiry: float,
     risk_free_rate: float,
     call_price: Optional[float] = None,
-    put_price: Optional[float] = None
+    put_price: Optional[float] = None,
+    discount_factor: Optional[float] = None
 ) -> Dict:
     """
     Calculate synthetic option prices based on put-call parity.
@@ -105,13 +117,15 @@ def calculate_synthetic_prices(
         risk_free_rate: Annual risk-free rate
         call_price: Market call price (optional)
         put_price: Market put price (optional)
+        discount_factor: Precomputed e^(-rT) (optional)
 
     Returns:
         Dictionary containing:
         - synthetic_call: What call should be worth based on put
         - synthetic_put: What put should be worth based on call
     """
-    discount_factor = math.exp(-risk_free_rate * time_to_expiry)
+    if discount_factor is None:
+        discount_factor = _discount(risk_free_rate, time_to_expiry)
     parity_value = stock_price - (strike * discount_factor)
 
     synthetic_call = put_price + parity_value if put_price is not None else None
@@ -123,10 +137,126 @@ def calculate_synthetic_prices(
     }
 
 
+def calculate_parity_batch(
+    strikes: Sequence[float],
+    call_prices: Sequence[float],
+    put_prices: Sequence[float],
+    discount_factors: Sequence[float],
+    stock_price: float,
+    threshold: float = 0.02,
+    dtype: type = np.float64
+) -> Dict[str, np.ndarray]:
+    """
+    Vectorized put-call parity and synthetic prices for a whole chain.
+
+    Computes the same quantities as calculate_put_call_parity_violation and
+    calculate_synthetic_prices, one element per (strike, expiry) pair, in a
+    handful of array operations instead of two Python calls per pair.
+
+    Args:
+        strikes: Option strike prices
+        call_prices: Market call prices (mid)
+        put_prices: Market put prices (mid)
+        discount_factors: e^(-rT) for each pair's expiry
+        stock_price: Current stock price
+        threshold: Violation threshold as percentage (default 0.02 = 2%)
+        dtype: Float type for the math. np.float32 halves memory traffic on
+            large batches; quotes are cent-precision, so the 2%+ thresholds
+            are unaffected, but outputs carry float32 rounding noise.
+
+    Returns:
+        Dictionary of arrays:
+        - parity_value, market_spread, violation_dollars, violation_pct
+        - is_violation: True where abs(violation_pct) > threshold
+        - arbitrage_type: 'call_overpriced' | 'put_overpriced' | 'no_violation'
+        - synthetic_call, synthetic_put
+    """
+    strikes = np.asarray(strikes, dtype=dtype)
+    call_prices = np.asarray(call_prices, dtype=dtype)
+    put_prices = np.asarray(put_prices, dtype=dtype)
+    discount_factors = np.asarray(discount_factors, dtype=dtype)
+    stock_price = dtype(stock_price)
+
+    parity_value = stock_price - strikes * discount_factors
+    market_spread = call_prices - put_prices
+    violation_dollars = market_spread - parity_value
+
+    positive = strikes > 0
+    violation_pct = np.where(
+        positive,
+        violation_dollars / np.where(positive, strikes, dtype(1)) * dtype(100),
+        dtype(0)
+    )
+
+    is_violation = np.abs(violation_pct) > dtype(threshold * 100)
+
+    return {
+        'parity_value': parity_value,
+        'market_spread': market_spread,
+        'violation_dollars': violation_dollars,
+        'violation_pct': violation_pct,
+        'is_violation': is_violation,
+        'arbitrage_type': np.select(
+            [is_violation & (violation_dollars > 0), is_violation],
+            ['call_overpriced', 'put_overpriced'],
+            default='no_violation'
+        ),
+        'synthetic_call': put_prices + parity_value,
+        'synthetic_put': call_prices - parity_value
+    }
+
+
+def calculate_put_call_parity_violations_batch(
+    call_prices: Sequence[float],
+    put_prices: Sequence[float],
+    stock_price: float,
+    strikes: Sequence[float],
+    time_to_expiry: Sequence[float],
+    risk_free_rate: float,
+    threshold: float = 0.02,
+    dtype: type = np.float64
+) -> Dict[str, np.ndarray]:
+    """
+    Vectorized calculate_put_call_parity_violation for a whole chain.
+
+    Args:
+        call_prices: Market call prices (mid)
+        put_prices: Market put prices (mid)
+        stock_price: Current stock price
+        strikes: Option strike prices
+        time_to_expiry: Time to expiration in years, per option or shared
+        risk_free_rate: Annual risk-free rate
+        threshold: Violation threshold as percentage (default 0.02 = 2%)
+        dtype: Float type for the math (see calculate_parity_batch)
+
+    Returns:
+        Dictionary of arrays with the same keys as the scalar function:
+        parity_value, market_spread, violation_dollars, violation_pct,
+        is_violation and arbitrage_type.
+    """
+    discount_factors = np.exp(dtype(-risk_free_rate) * np.asarray(time_to_expiry, dtype=dtype))
+    batch = calculate_parity_batch(
+        strikes=strikes,
+        call_prices=call_prices,
+        put_prices=put_prices,
+        discount_factors=np.broadcast_to(discount_factors, np.shape(strikes)),
+        stock_price=stock_price,
+        threshold=threshold,
+        dtype=dtype
+    )
+    return {
+        key: batch[key]
+        for key in ('parity_value', 'market_spread', 'violation_dollars',
+                    'violation_pct', 'is_violation', 'arbitrage_type')
+    }
+
+
 def detect_statistical_outliers(
     options_data: List[Dict],
     metric: str = 'iv',
-    threshold: float = 2.0
+    threshold: float = 2.0,
+    mean: Optional[float] = None,
+    std: Optional[float] = None
 ) -> List[Dict]:
     """
     Identify options that are statistical outliers (2+ std deviations from mean).
@@ -135,6 +265,8 @@ def detect_statistical_outliers(
         options_data: List of option dicts with metrics (iv, volume, etc.)
         metric: Which metric to analyze ('iv' for implied volatility)
         threshold: Z-score threshold (default 2.0 = 2 standard deviations)
+        mean: Precomputed mean of the metric (optional, skips the stats pass)
+        std: Precomputed sample standard deviation (required with mean)
 
     Returns:
         List of options with added fields:
@@ -146,47 +278,92 @@ def detect_statistical_outliers(
     if not options_data:
         return []
 
-    # Extract metric values
-    values = []
-    for opt in options_data:
-        val = opt.get(metric)
-        if val is not None and not math.isnan(val):
-            values.append(val)
-
-    if len(values) < 3:  # Need at least 3 data points for meaningful stats
-        # Return original data with null stats
-        for opt in options_data:
-            opt[f'{metric}_mean'] = None
-            opt[f'{metric}_std'] = None
-            opt[f'{metric}_z_score'] = 0.0
-            opt[f'is_{metric}_outlier'] = False
-        return options_data
-
-    # Calculate mean and standard deviation
-    mean = np.mean(values)
-    std = np.std(values, ddof=1)  # Sample standard deviation
+    # Missing values become NaN so the whole metric column is one array
+    values = np.fromiter(
+        (np.nan if opt.get(metric) is None else opt[metric] for opt in options_data),
+        dtype=np.float64,
+        count=len(options_data)
+    )
+    valid = ~np.isnan(values)
+
+    if mean is None or std is None:
+        if np.count_nonzero(valid) < 3:  # Need at least 3 data points for meaningful stats
+            # Return original data with null stats
+            for opt in options_data:
+                opt[f'{metric}_mean'] = None
+                opt[f'{metric}_std'] = None
+                opt[f'{metric}_z_score'] = 0.0
+                opt[f'is_{metric}_outlier'] = False
+            return options_data
+
+        # Calculate mean and standard deviation
+        mean = float(np.mean(values[valid]))
+        std = float(np.std(values[valid], ddof=1))  # Sample standard deviation
 
     # Calculate z-scores and identify outliers
-    result = []
-    for opt in options_data:
-        val = opt.get(metric)
-
-        if val is not None and not math.isnan(val) and std > 0:
-            z_score = (val - mean) / std
-            is_outlier = abs(z_score) > threshold
-        else:
-            z_score = 0.0
-            is_outlier = False
+    # std is loop-invariant: a zero (or NaN) spread means nothing is an outlier
+    if std > 0:
+        z_scores = np.where(valid, (values - mean) / std, 0.0)
+        outliers = np.abs(z_scores) > threshold
+    else:
+        z_scores = np.zeros_like(values)
+        outliers = np.zeros(values.shape, dtype=bool)
 
-        # Add statistical fields
+    # Add statistical fields
+    for opt, z_score, is_outlier in zip(options_data, z_scores.tolist(), outliers.tolist()):
         opt[f'{metric}_mean'] = mean
         opt[f'{metric}_std'] = std
         opt[f'{metric}_z_score'] = z_score
         opt[f'is_{metric}_outlier'] = is_outlier
 
-        result.append(opt)
+    return options_data
+
+
+# Score tables for calculate_opportunity_scores: thresholds are inclusive
+# lower bounds (np.searchsorted side='right'), points are per bucket.
+_VIOL_TH = np.array([2, 3, 5])
+_VIOL_PTS = np.array([0, 30, 40, 50])
+_Z_TH = np.array([2, 2.5, 3])
+_Z_PTS = np.array([0, 15, 20, 30])
+_VOL_TH = np.array([200, 500])
+_VOL_PTS = np.array([0, 5, 10])
+# Moneyness bands are inclusive at both ends, so the upper edges are nudged up
+_MONEYNESS_TH = np.array([0.90, 0.95, np.nextafter(1.05, np.inf), np.nextafter(1.10, np.inf)])
+_MONEYNESS_PTS = np.array([0, 5, 10, 5, 0])
+
+
+def calculate_opportunity_scores(
+    violation_pct: Sequence[float],
+    is_violation: Sequence[bool],
+    iv_z_score: Sequence[float],
+    is_iv_outlier: Sequence[bool],
+    total_volume: Sequence[int],
+    moneyness: Sequence[float]
+) -> np.ndarray:
+    """
+    Vectorized calculate_opportunity_score for a batch of opportunities.
+
+    Takes one array per calculate_opportunity_score argument and returns
+    an integer array of scores from 0 to 100.
+    """
+    # NaN never clears a threshold in the scalar comparisons, so score it as 0
+    abs_violation_pct = np.nan_to_num(np.abs(np.asarray(violation_pct, dtype=np.float64)))
+    abs_z_score = np.nan_to_num(np.abs(np.asarray(iv_z_score, dtype=np.float64)))
+
+    # Put-Call Parity Violation (0-50 points)
+    score = _VIOL_PTS[np.searchsorted(_VIOL_TH, abs_violation_pct, side='right')] * np.asarray(is_violation, dtype=bool)
 
-    return result
+    # IV Statistical Outlier (0-30 points)
+    score = score + _Z_PTS[np.searchsorted(_Z_TH, abs_z_score, side='right')] * np.asarray(is_iv_outlier, dtype=bool)
+
+    # Liquidity bonus (0-10 points)
+    score = score + _VOL_PTS[np.searchsorted(_VOL_TH, total_volume, side='right')]
+
+    # Near-the-money bonus (0-10 points)
+    # More reliable pricing for ATM options
+    score = score + _MONEYNESS_PTS[np.searchsorted(_MONEYNESS_TH, moneyness, side='right')]
+
+    return np.minimum(score, 100)  # Cap at 100
 
 
 def calculate_opportunity_score(
@@ -211,39 +388,6 @@ def calculate_opportunity_score(
     Returns:
         Integer score from 0 to 100
     """
-    score = 0
-
-    # Put-Call Parity Violation (0-50 points)
-    abs_violation_pct = abs(violation_pct)
-    if is_violation:
-        if abs_violation_pct >= 5:
-            score += 50
-        elif abs_violation_pct >= 3:
-            score += 40
-        elif abs_violation_pct >= 2:
-            score += 30
-
-    # IV Statistical Outlier (0-30 points)
-    abs_z_score = abs(iv_z_score)
-    if is_iv_outlier:
-        if abs_z_score >= 3:
-            score += 30
-        elif abs_z_score >= 2.5:
-            score += 20
-        elif abs_z_score >= 2:
-            score += 15
-
-    # Liquidity bonus (0-10 points)
-    if total_volume >= 500:
-        score += 10
-    elif total_volume >= 200:
-        score += 5
-
-    # Near-the-money bonus (0-10 points)
-    # More reliable pricing for ATM options
-    if 0.95 <= moneyness <= 1.05:  # Within 5% of ATM
-        score += 10
-    elif 0.90 <= moneyness <= 1.10:  # Within 10% of ATM
-        score += 5
-
-    return min(score, 100)  # Cap at 100
+    return int(calculate_opportunity_scores(
+        [violation_pct], [is_violation], [iv_z_score], [is_iv_outlier], [total_volume], [moneyness]
+    )[0])
@@ -0,0 +1,175 @@
+"""Tests for the vectorized put-call parity math against the scalar reference."""
+
+import math
+
+import numpy as np
+import pytest
+
+from put_call_parity import (
+    calculate_opportunity_scores,
+    calculate_parity_batch,
+    calculate_put_call_parity_violation,
+    calculate_synthetic_prices,
+    detect_statistical_outliers,
+)
+
+STOCK_PRICE = 100.0
+RISK_FREE_RATE = 0.045
+THRESHOLD = 0.02
+
+
+def _scalar_reference(strikes, call_prices, put_prices, discount_factors, stock_price, threshold):
+    """Run the scalar functions pair by pair, as the scanner used to."""
+    rows = []
+    for strike, call, put, discount in zip(strikes, call_prices, put_prices, discount_factors):
+        parity = calculate_put_call_parity_violation(
+            call_price=call,
+            put_price=put,
+            stock_price=stock_price,
+            strike=strike,
+            time_to_expiry=0.0,
+            risk_free_rate=0.0,
+            threshold=threshold,
+            discount_factor=discount
+        )
+        parity.update(calculate_synthetic_prices(
+            stock_price=stock_price,
+            strike=strike,
+            time_to_expiry=0.0,
+            risk_free_rate=0.0,
+            call_price=call,
+            put_price=put,
+            discount_factor=discount
+        ))
+        rows.append(parity)
+    return rows
+
+
+def _assert_batch_matches(strikes, call_prices, put_prices, discount_factors,
+                          stock_price=STOCK_PRICE, threshold=THRESHOLD):
+    batch = calculate_parity_batch(
+        strikes=strikes,
+        call_prices=call_prices,
+        put_prices=put_prices,
+        discount_factors=discount_factors,
+        stock_price=stock_price,
+        threshold=threshold
+    )
+    reference = _scalar_reference(strikes, call_prices, put_prices, discount_factors, stock_price, threshold)
+
+    for i, expected in enumerate(reference):
+        for key in ('parity_value', 'market_spread', 'violation_dollars', 'violation_pct',
+                    'synthetic_call', 'synthetic_put'):
+            np.testing.assert_allclose(batch[key][i], expected[key], rtol=1e-12, atol=1e-12,
+                                       err_msg=f"{key} at index {i}")
+        assert bool(batch['is_violation'][i]) == expected['is_violation'], f"is_violation at index {i}"
+        assert batch['arbitrage_type'][i] == expected['arbitrage_type'], f"arbitrage_type at index {i}"
+
+
+def test_batch_matches_scalar_on_chain():
+    rng = np.random.default_rng(7)
+    strikes = np.arange(50.0, 152.5, 2.5)
+    discount = math.exp(-RISK_FREE_RATE * 30 / 365)
+    parity = STOCK_PRICE - strikes * discount
+    put_prices = np.maximum(strikes * discount - STOCK_PRICE, 0) + rng.uniform(0.2, 3.0, strikes.size)
+    # Noise of up to +/-5% of the strike puts a share of pairs past the threshold
+    call_prices = put_prices + parity + strikes * rng.uniform(-0.05, 0.05, strikes.size)
+
+    _assert_batch_matches(strikes.tolist(), call_prices.tolist(), put_prices.tolist(), [discount] * strikes.size)
+
+
+def test_batch_matches_scalar_for_zero_strike():
+    _assert_batch_matches([0.0, 100.0], [5.0, 5.0], [1.0, 1.0], [1.0, 1.0])
+
+
+def test_batch_matches_scalar_for_nan_quotes():
+    nan = float('nan')
+    batch = calculate_parity_batch(
+        strikes=[100.0, 100.0],
+        call_prices=[nan, 5.0],
+        put_prices=[1.0, nan],
+        discount_factors=[1.0, 1.0],
+        stock_price=STOCK_PRICE
+    )
+    reference = _scalar_reference([100.0, 100.0], [nan, 5.0], [1.0, nan], [1.0, 1.0], STOCK_PRICE, THRESHOLD)
+
+    for i, expected in enumerate(reference):
+        assert math.isnan(batch['violation_pct'][i]) and math.isnan(expected['violation_pct'])
+        assert bool(batch['is_violation'][i]) is expected['is_violation'] is False
+        assert batch['arbitrage_type'][i] == expected['arbitrage_type'] == 'no_violation'
+
+
+@pytest.mark.parametrize('spread, is_violation', [
+    (2.0, False),    # exactly at the threshold is not a violation
+    (2.01, True),
+    (-2.0, False),
+    (-2.01, True),
+])
+def test_batch_matches_scalar_at_threshold(spread, is_violation):
+    # With S == K and no discounting the violation is the spread itself
+    _assert_batch_matches([100.0], [1.0 + spread], [1.0], [1.0])
+
+    batch = calculate_parity_batch(
+        strikes=[100.0],
+        call_prices=[1.0 + spread],
+        put_prices=[1.0],
+        discount_factors=[1.0],
+        stock_price=STOCK_PRICE
+    )
+    assert bool(batch['is_violation'][0]) is is_violation
+
+
+def test_float32_batch_keeps_violations_and_scores():
+    # Several expiries of a chain with cent-precision quotes
+    rng = np.random.default_rng(11)
+    strikes = np.tile(np.arange(50.0, 152.5, 2.5), 4)
+    discounts = np.repeat([math.exp(-RISK_FREE_RATE * d / 365) for d in (7, 21, 45, 90)], strikes.size // 4)
+    put_prices = np.round(np.maximum(strikes * discounts - STOCK_PRICE, 0) + rng.uniform(0.05, 4.0, strikes.size), 2)
+    call_prices = np.round(
+        put_prices + STOCK_PRICE - strikes * discounts + strikes * rng.uniform(-0.06, 0.06, strikes.size), 2
+    )
+    call_prices = np.maximum(call_prices, 0.01)
+
+    results = {
+        dtype: calculate_parity_batch(
+            strikes=strikes,
+            call_prices=call_prices,
+            put_prices=put_prices,
+            discount_factors=discounts,
+            stock_price=STOCK_PRICE,
+            dtype=dtype
+        )
+        for dtype in (np.float64, np.float32)
+    }
+    wide, narrow = results[np.float64], results[np.float32]
+
+    np.testing.assert_array_equal(narrow['is_violation'], wide['is_violation'])
+    np.testing.assert_array_equal(narrow['arbitrage_type'], wide['arbitrage_type'])
+    np.testing.assert_allclose(narrow['violation_pct'], wide['violation_pct'], atol=1e-3)
+
+    # The 2%/3%/5% score buckets come out the same
+    zeros = np.zeros(strikes.size)
+    no_outliers = np.zeros(strikes.size, dtype=bool)
+    volume = np.zeros(strikes.size, dtype=np.int64)
+    moneyness = STOCK_PRICE / strikes
+    np.testing.assert_array_equal(
+        calculate_opportunity_scores(narrow['violation_pct'], narrow['is_violation'],
+                                     zeros, no_outliers, volume, moneyness),
+        calculate_opportunity_scores(wide['violation_pct'], wide['is_violation'],
+                                     zeros, no_outliers, volume, moneyness)
+    )
+
+
+def test_float32_ivs_keep_outlier_flags():
+    rng = np.random.default_rng(5)
+    ivs = rng.uniform(0.2, 0.6, 120)
+    ivs[::17] *= 3  # a few IV spikes
+
+    wide = detect_statistical_outliers([{'iv': float(iv)} for iv in ivs])
+    narrow = detect_statistical_outliers([{'iv': float(iv)} for iv in ivs.astype(np.float32)])
+
+    assert any(opt['is_iv_outlier'] for opt in wide)
+    assert [opt['is_iv_outlier'] for opt in narrow] == [opt['is_iv_outlier'] for opt in wide]
+    np.testing.assert_allclose(
+        [opt['iv_z_score'] for opt in narrow], [opt['iv_z_score'] for opt in wide], atol=1e-5
+    )
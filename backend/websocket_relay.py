@@ -13,27 +13,33 @@ local IB Gateway without requiring port forwarding or VPN.
 import asyncio
 import json
 import logging
+import time
 from typing import Dict, Optional, Any, Callable, Awaitable
 from dataclasses import dataclass, field
-from datetime import datetime
-import uuid
+from datetime import datetime, timedelta
 
+import async_timeout
+import orjson
 from fastapi import WebSocket, WebSocketDisconnect
-from starlette.websockets import WebSocketState
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class RelayConnection:
     """Represents a connected relay agent."""
     user_id: str
     websocket: WebSocket
     connected_at: datetime = field(default_factory=datetime.utcnow)
-    last_heartbeat: datetime = field(default_factory=datetime.utcnow)
+    # time.monotonic() of the last inbound message; converted on demand
+    last_heartbeat: float = field(default_factory=time.monotonic)
+    # Set when the relay registers and cleared once its socket is replaced,
+    # disconnected or fails a send, so checks don't poke the websocket state
+    connected: bool = True
     ibkr_connected: bool = False
     ibkr_account: Optional[str] = None
-    pending_requests: Dict[str, asyncio.Future] = field(default_factory=dict)
+    pending_requests: Dict[int, asyncio.Future] = field(default_factory=dict)
+    next_request_id: int = 0
 
 
 class RelayManager:
@@ -41,7 +47,6 @@ class RelayManager:
 
     def __init__(self):
         self._connections: Dict[str, RelayConnection] = {}
-        self._lock = asyncio.Lock()
 
     async def connect(self, user_id: str, websocket: WebSocket) -> bool:
         """Register a new relay connection for a user.
@@ -53,57 +58,64 @@ class RelayManager:
         Returns:
             True if connected successfully
         """
-        async with self._lock:
-            # Close existing connection if any
-            if user_id in self._connections:
-                old_conn = self._connections[user_id]
-                try:
-                    await old_conn.websocket.close(code=1000, reason="New connection")
-                except Exception:
-                    pass
-
-            self._connections[user_id] = RelayConnection(
-                user_id=user_id,
-                websocket=websocket
-            )
-            logger.info(f"Relay connected for user {user_id}")
-            return True
+        # Install the new connection before closing the old one. Nothing is
+        # awaited between the read and the write, so no lock is needed.
+        old_conn = self._connections.get(user_id)
+        self._connections[user_id] = RelayConnection(
+            user_id=user_id,
+            websocket=websocket
+        )
+        logger.info(f"Relay connected for user {user_id}")
+
+        # Close existing connection if any
+        if old_conn is not None:
+            old_conn.connected = False
+            try:
+                await old_conn.websocket.close(code=1000, reason="New connection")
+            except Exception:
+                pass
+
+        return True
 
     async def disconnect(self, user_id: str):
         """Remove a relay connection."""
-        async with self._lock:
-            if user_id in self._connections:
-                conn = self._connections.pop(user_id)
-                # Cancel all pending requests
-                for future in conn.pending_requests.values():
-                    if not future.done():
-                        future.cancel()
-                logger.info(f"Relay disconnected for user {user_id}")
+        conn = self._connections.pop(user_id, None)
+        if conn is not None:
+            conn.connected = False
+            # Cancel all pending requests
+            for future in conn.pending_requests.values():
+                if not future.done():
+                    future.cancel()
+            logger.info(f"Relay disconnected for user {user_id}")
 
     def is_connected(self, user_id: str) -> bool:
         """Check if a user's relay is connected."""
-        if user_id not in self._connections:
-            return False
-
-        conn = self._connections[user_id]
-        return conn.websocket.client_state == WebSocketState.CONNECTED
+        conn = self._connections.get(user_id)
+        return conn is not None and conn.connected
 
     def get_connection_status(self, user_id: str) -> Dict[str, Any]:
         """Get detailed connection status for a user."""
-        if user_id not in self._connections:
+        conn = self._connections.get(user_id)
+        if conn is None:
             return {
                 "connected": False,
                 "ibkr_connected": False,
                 "account": None
             }
 
-        conn = self._connections[user_id]
+        return self._connection_status(conn)
+
+    @staticmethod
+    def _connection_status(conn: RelayConnection) -> Dict[str, Any]:
+        """Build the status dict for a registered connection."""
         return {
-            "connected": conn.websocket.client_state == WebSocketState.CONNECTED,
+            "connected": conn.connected,
             "ibkr_connected": conn.ibkr_connected,
             "account": conn.ibkr_account,
             "connected_at": conn.connected_at.isoformat(),
-            "last_heartbeat": conn.last_heartbeat.isoformat()
+            "last_heartbeat": (
+                datetime.utcnow() - timedelta(seconds=time.monotonic() - conn.last_heartbeat)
+            ).isoformat()
         }
 
     async def send_request(
@@ -134,13 +146,17 @@ class RelayManager:
 
         conn = self._connections[user_id]
 
-        # Generate request ID
-        request_id = str(uuid.uuid4())
+        # Request IDs only need to be unique per connection
+        conn.next_request_id += 1
+        request_id = conn.next_request_id
 
         # Create future for response
-        response_future: asyncio.Future = asyncio.Future()
+        response_future: asyncio.Future = asyncio.get_running_loop().create_future()
         conn.pending_requests[request_id] = response_future
 
+        # Nothing is awaited between registering the future and entering the
+        # try, so the finally below removes it on every exit path (response,
+        # error, timeout or cancellation).
         try:
             # Send request
             request = {
@@ -148,19 +164,21 @@ class RelayManager:
                 "action": action,
                 "params": params or {}
             }
-            await conn.websocket.send_json(request)
+            try:
+                await conn.websocket.send_text(orjson.dumps(request).decode())
+            except Exception:
+                conn.connected = False
+                raise
 
-            # Wait for response with timeout
+            # Wait for response with timeout (a deadline on this task rather
+            # than the extra wrapper task asyncio.wait_for creates)
             try:
-                response = await asyncio.wait_for(response_future, timeout=timeout)
+                async with async_timeout.timeout(timeout):
+                    # handle_message resolves this with the response data, or
+                    # fails it with RuntimeError if the relay reported an error
+                    return await response_future
             except asyncio.TimeoutError:
-                raise TimeoutError(f"Request {action} timed out after {timeout}s")
-
-            # Check for error
-            if response.get("error"):
-                raise RuntimeError(response["error"])
-
-            return response.get("data", {})
+                raise TimeoutError(f"Request {action} timed out after {timeout}s") from None
 
         finally:
             # Clean up pending request
@@ -178,7 +196,7 @@ class RelayManager:
             return
 
         conn = self._connections[user_id]
-        conn.last_heartbeat = datetime.utcnow()
+        conn.last_heartbeat = time.monotonic()
 
         message_type = message.get("type", "response")
 
@@ -188,7 +206,11 @@ class RelayManager:
             if request_id and request_id in conn.pending_requests:
                 future = conn.pending_requests[request_id]
                 if not future.done():
-                    future.set_result(message)
+                    error = message.get("error")
+                    if error:
+                        future.set_exception(RuntimeError(error))
+                    else:
+                        future.set_result(message.get("data", {}))
 
         elif message_type == "status":
             # Update connection status
@@ -205,15 +227,16 @@ class RelayManager:
         if self.is_connected(user_id):
             conn = self._connections[user_id]
             try:
-                await conn.websocket.send_json(message)
+                await conn.websocket.send_text(orjson.dumps(message).decode())
             except Exception as e:
+                conn.connected = False
                 logger.error(f"Failed to send to relay {user_id}: {e}")
 
     def get_all_connections(self) -> Dict[str, Dict[str, Any]]:
         """Get status of all connections (for admin monitoring)."""
         return {
-            user_id: self.get_connection_status(user_id)
-            for user_id in self._connections
+            user_id: self._connection_status(conn)
+            for user_id, conn in self._connections.items()
         }
 
 
@@ -322,7 +345,11 @@ class IBKRProxyService:
         expiry: str,
         strikes: Optional[list] = None
     ) -> Dict[str, Any]:
-        """Get full option chain for a symbol and expiration."""
+        """Get full option chain for a symbol and expiration.
+
+        Returns ``{"calls": {...}, "puts": {...}}`` where each side maps
+        strike, bid, ask, last, volume, delta and iv to index-aligned lists.
+        """
         result = await self.relay.send_request(
             self.user_id,
             "get_option_chain",
@@ -9,18 +9,20 @@ Usage:
     python relay_agent.py --token <your-jwt-token> --server wss://your-backend.railway.app
 
 Requirements:
-    pip install ib_insync websockets
+    pip install ib_insync websockets orjson numpy
 """
 
 import argparse
 import asyncio
-import json
 import logging
 import signal
 import sys
+import time
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, List, Set, Tuple
 
+import numpy as np
+import orjson
 import websockets
 from websockets.exceptions import ConnectionClosed
 
@@ -39,6 +41,37 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Max requests handled against IB Gateway at the same time
+MAX_CONCURRENT_REQUESTS = 16
+
+# Field names for get_positions / get_portfolio rows, in extraction order
+POSITION_KEYS = (
+    "account", "symbol", "secType", "exchange", "currency", "position",
+    "avgCost", "conId", "strike", "right", "expiry",
+)
+PORTFOLIO_KEYS = (
+    "account", "symbol", "secType", "position", "marketPrice", "marketValue",
+    "averageCost", "unrealizedPNL", "realizedPNL", "conId",
+)
+
+# Column names for each side of a get_option_chain response
+CHAIN_KEYS = ("strike", "bid", "ask", "last", "volume", "delta", "iv")
+CHAIN_FLOAT_KEYS = ("strike", "bid", "ask", "last", "delta", "iv")
+
+# Qualified option contracts kept before the cache is reset
+MAX_CACHED_OPTIONS = 5000
+
+# Resend an unchanged status at most this often (seconds)
+STATUS_KEEPALIVE = 300
+
+# How long option chain descriptors stay cached (seconds)
+CHAIN_CACHE_TTL = 300
+
+
+def _nan_to_none(value, default=None):
+    """Return ``default`` for IB's NaN placeholders, otherwise the value."""
+    return default if value != value else value
+
 
 class IBKRRelayAgent:
     """Relay agent that bridges local IB Gateway to cloud backend."""
@@ -62,6 +95,23 @@ class IBKRRelayAgent:
         self.running = False
         self.reconnect_delay = 5
 
+        # In-flight request handlers, capped at MAX_CONCURRENT_REQUESTS
+        self._request_tasks: Set[asyncio.Task] = set()
+        self._request_slots = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+        # Last status sent to the server and when (monotonic)
+        self._last_status: Optional[Tuple[bool, Optional[str]]] = None
+        self._last_status_sent = 0.0
+
+        # symbol -> qualified Stock contract
+        self._qualified_stocks: Dict[str, "Stock"] = {}
+
+        # (symbol, expiry, strike, right) -> qualified Option contract
+        self._qualified_options: Dict[Tuple[str, str, float, str], "Option"] = {}
+
+        # symbol -> (fetched_at, reqSecDefOptParams result)
+        self._chain_cache: Dict[str, Tuple[float, list]] = {}
+
     async def connect_ibkr(self) -> bool:
         """Connect to local IB Gateway."""
         if not IB_AVAILABLE:
@@ -70,14 +120,11 @@ class IBKRRelayAgent:
 
         try:
             self.ib = IB()
-            await asyncio.wait_for(
-                asyncio.to_thread(
-                    self.ib.connect,
-                    self.ibkr_host,
-                    self.ibkr_port,
-                    clientId=self.ibkr_client_id,
-                    readonly=True
-                ),
+            await self.ib.connectAsync(
+                self.ibkr_host,
+                self.ibkr_port,
+                clientId=self.ibkr_client_id,
+                readonly=True,
                 timeout=10.0
             )
             logger.info(f"Connected to IB Gateway at {self.ibkr_host}:{self.ibkr_port}")
@@ -106,7 +153,10 @@ class IBKRRelayAgent:
                 ws_url,
                 extra_headers=headers,
                 ping_interval=30,
-                ping_timeout=10
+                ping_timeout=10,
+                # Most frames are small quotes where deflate costs more CPU
+                # than it saves in bandwidth
+                compression=None
             )
             logger.info(f"Connected to server: {self.server_url}")
             return True
@@ -115,20 +165,39 @@ class IBKRRelayAgent:
             logger.error(f"Failed to connect to server: {e}")
             return False
 
-    async def send_status(self):
-        """Send current status to server."""
+    async def send_status(self, force: bool = False):
+        """Send current status to server.
+
+        Unless forced, the status is only sent when it changed or the last
+        one is older than STATUS_KEEPALIVE; the websocket's own pings cover
+        liveness in between.
+        """
         if not self.ws:
             return
 
+        ibkr_connected = self.ib.isConnected() if self.ib else False
+        accounts = self.ib.managedAccounts() if self.ib else None
+        state = (ibkr_connected, accounts[0] if accounts else None)
+
+        now = time.monotonic()
+        if (
+            not force
+            and state == self._last_status
+            and now - self._last_status_sent < STATUS_KEEPALIVE
+        ):
+            return
+
         status = {
             "type": "status",
-            "ibkr_connected": self.ib.isConnected() if self.ib else False,
-            "account": self.ib.managedAccounts()[0] if self.ib and self.ib.managedAccounts() else None,
+            "ibkr_connected": state[0],
+            "account": state[1],
             "timestamp": datetime.utcnow().isoformat()
         }
 
         try:
-            await self.ws.send(json.dumps(status))
+            await self.ws.send(orjson.dumps(status).decode())
+            self._last_status = state
+            self._last_status_sent = now
         except Exception as e:
             logger.error(f"Failed to send status: {e}")
 
@@ -171,6 +240,97 @@ class IBKRRelayAgent:
                 "error": str(e)
             }
 
+    async def _wait_for_ticker(
+        self,
+        ticker,
+        ready: Callable[[Any], bool],
+        timeout: float = 2.0
+    ):
+        """Wait until a snapshot ticker satisfies ``ready`` or the timeout expires."""
+        if ready(ticker):
+            return
+
+        filled = asyncio.Event()
+
+        def on_update(t):
+            if ready(t):
+                filled.set()
+
+        ticker.updateEvent += on_update
+        try:
+            await asyncio.wait_for(filled.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass  # Use whatever data arrived
+        finally:
+            ticker.updateEvent -= on_update
+
+    async def _stock(self, symbol: str) -> "Stock":
+        """Return a qualified Stock contract for a symbol, qualifying it once."""
+        contract = self._qualified_stocks.get(symbol)
+        if contract is None:
+            contract = Stock(symbol, "SMART", "USD")
+            await self.ib.qualifyContractsAsync(contract)
+            if contract.conId:
+                self._qualified_stocks[symbol] = contract
+        return contract
+
+    async def _options(
+        self,
+        symbol: str,
+        expiry: str,
+        legs: List[Tuple[float, str]]
+    ) -> List["Option"]:
+        """Return qualified Option contracts for (strike, right) legs.
+
+        Legs not seen before are qualified together in one batch; ones IB
+        can't resolve are left out of the result.
+        """
+        if len(self._qualified_options) > MAX_CACHED_OPTIONS:
+            self._qualified_options.clear()
+
+        keys = [(symbol, expiry, float(strike), right) for strike, right in legs]
+        # Resolve into a local dict so a concurrent cache reset can't drop legs
+        found = {
+            key: self._qualified_options[key]
+            for key in keys
+            if key in self._qualified_options
+        }
+        missing = [
+            Option(symbol, expiry, key[2], key[3], "SMART")
+            for key in keys
+            if key not in found
+        ]
+        if missing:
+            for contract in await self.ib.qualifyContractsAsync(*missing):
+                if contract.conId:
+                    key = (symbol, expiry, float(contract.strike), contract.right)
+                    found[key] = contract
+                    self._qualified_options[key] = contract
+
+        return [found[key] for key in keys if key in found]
+
+    async def _get_option_chains(self, symbol: str) -> list:
+        """Return the option chain descriptors for a symbol, cached for a few minutes.
+
+        Expirations and strikes are usually requested back-to-back for the
+        same symbol, so this saves a qualify and reqSecDefOptParams round-trip.
+        """
+        cached = self._chain_cache.get(symbol)
+        if cached and time.monotonic() - cached[0] < CHAIN_CACHE_TTL:
+            return cached[1]
+
+        contract = await self._stock(symbol)
+
+        chains = await self.ib.reqSecDefOptParamsAsync(
+            contract.symbol,
+            "",
+            contract.secType,
+            contract.conId
+        )
+        if chains:
+            self._chain_cache[symbol] = (time.monotonic(), chains)
+        return chains
+
     async def _execute_action(self, action: str, params: Dict[str, Any]) -> Dict[str, Any]:
         """Execute an IBKR action."""
 
@@ -179,73 +339,60 @@ class IBKRRelayAgent:
             return {"accounts": accounts}
 
         elif action == "get_positions":
-            positions = self.ib.positions(params.get("account"))
-            return {
-                "positions": [
-                    {
-                        "account": pos.account,
-                        "symbol": pos.contract.symbol,
-                        "secType": pos.contract.secType,
-                        "exchange": pos.contract.exchange,
-                        "currency": pos.contract.currency,
-                        "position": pos.position,
-                        "avgCost": pos.avgCost,
-                        "conId": pos.contract.conId,
-                        # Option-specific fields
-                        "strike": getattr(pos.contract, 'strike', None),
-                        "right": getattr(pos.contract, 'right', None),
-                        "expiry": getattr(pos.contract, 'lastTradeDateOrContractMonth', None),
-                    }
-                    for pos in positions
-                ]
-            }
+            rows = []
+            for pos in self.ib.positions(params.get("account")):
+                contract = pos.contract
+                rows.append(dict(zip(POSITION_KEYS, (
+                    pos.account,
+                    contract.symbol,
+                    contract.secType,
+                    contract.exchange,
+                    contract.currency,
+                    pos.position,
+                    pos.avgCost,
+                    contract.conId,
+                    # Option-specific fields (Contract always has these)
+                    contract.strike,
+                    contract.right,
+                    contract.lastTradeDateOrContractMonth,
+                ))))
+            return {"positions": rows}
 
         elif action == "get_portfolio":
-            portfolio = self.ib.portfolio(params.get("account"))
-            return {
-                "portfolio": [
-                    {
-                        "account": item.account,
-                        "symbol": item.contract.symbol,
-                        "secType": item.contract.secType,
-                        "position": item.position,
-                        "marketPrice": item.marketPrice,
-                        "marketValue": item.marketValue,
-                        "averageCost": item.averageCost,
-                        "unrealizedPNL": item.unrealizedPNL,
-                        "realizedPNL": item.realizedPNL,
-                        "conId": item.contract.conId,
-                    }
-                    for item in portfolio
-                ]
-            }
+            rows = []
+            for item in self.ib.portfolio(params.get("account")):
+                contract = item.contract
+                rows.append(dict(zip(PORTFOLIO_KEYS, (
+                    item.account,
+                    contract.symbol,
+                    contract.secType,
+                    item.position,
+                    item.marketPrice,
+                    item.marketValue,
+                    item.averageCost,
+                    item.unrealizedPNL,
+                    item.realizedPNL,
+                    contract.conId,
+                ))))
+            return {"portfolio": rows}
 
         elif action == "get_price":
             symbol = params.get("symbol", "").upper()
-            contract = Stock(symbol, "SMART", "USD")
-            self.ib.qualifyContracts(contract)
+            contract = await self._stock(symbol)
 
             ticker = self.ib.reqMktData(contract, snapshot=True)
-            await asyncio.sleep(2)  # Wait for data
+            await self._wait_for_ticker(ticker, lambda t: t.marketPrice() == t.marketPrice())
             self.ib.cancelMktData(contract)
 
             price = ticker.marketPrice()
             if price != price:  # NaN check
                 price = ticker.close or ticker.last
 
-            return {"price": price if price == price else None}
+            return {"price": _nan_to_none(price)}
 
         elif action == "get_option_expirations":
             symbol = params.get("symbol", "").upper()
-            contract = Stock(symbol, "SMART", "USD")
-            self.ib.qualifyContracts(contract)
-
-            chains = self.ib.reqSecDefOptParams(
-                contract.symbol,
-                "",
-                contract.secType,
-                contract.conId
-            )
+            chains = await self._get_option_chains(symbol)
 
             expirations = set()
             for chain in chains:
@@ -256,16 +403,7 @@ class IBKRRelayAgent:
         elif action == "get_option_strikes":
             symbol = params.get("symbol", "").upper()
             expiry = params.get("expiry", "")
-
-            contract = Stock(symbol, "SMART", "USD")
-            self.ib.qualifyContracts(contract)
-
-            chains = self.ib.reqSecDefOptParams(
-                contract.symbol,
-                "",
-                contract.secType,
-                contract.conId
-            )
+            chains = await self._get_option_chains(symbol)
 
             strikes = set()
             for chain in chains:
@@ -282,22 +420,26 @@ class IBKRRelayAgent:
 
             right = "C" if option_type.upper() in ["C", "CALL"] else "P"
             contract = Option(symbol, expiry, strike, right, "SMART")
-            self.ib.qualifyContracts(contract)
+            await self.ib.qualifyContractsAsync(contract)
 
             ticker = self.ib.reqMktData(contract, snapshot=True)
-            await asyncio.sleep(2)
+            await self._wait_for_ticker(
+                ticker,
+                lambda t: t.bid == t.bid and t.ask == t.ask and t.modelGreeks is not None
+            )
             self.ib.cancelMktData(contract)
 
+            greeks = ticker.modelGreeks
             return {
-                "bid": ticker.bid if ticker.bid == ticker.bid else None,
-                "ask": ticker.ask if ticker.ask == ticker.ask else None,
-                "last": ticker.last if ticker.last == ticker.last else None,
-                "volume": ticker.volume if ticker.volume == ticker.volume else 0,
-                "delta": ticker.modelGreeks.delta if ticker.modelGreeks else None,
-                "gamma": ticker.modelGreeks.gamma if ticker.modelGreeks else None,
-                "theta": ticker.modelGreeks.theta if ticker.modelGreeks else None,
-                "vega": ticker.modelGreeks.vega if ticker.modelGreeks else None,
-                "iv": ticker.modelGreeks.impliedVol if ticker.modelGreeks else None,
+                "bid": _nan_to_none(ticker.bid),
+                "ask": _nan_to_none(ticker.ask),
+                "last": _nan_to_none(ticker.last),
+                "volume": _nan_to_none(ticker.volume, 0),
+                "delta": greeks.delta if greeks else None,
+                "gamma": greeks.gamma if greeks else None,
+                "theta": greeks.theta if greeks else None,
+                "vega": greeks.vega if greeks else None,
+                "iv": greeks.impliedVol if greeks else None,
             }
 
         elif action == "get_option_chain":
@@ -305,41 +447,56 @@ class IBKRRelayAgent:
             expiry = params.get("expiry", "")
             strikes = params.get("strikes", [])
 
-            chain_data = {"calls": [], "puts": []}
-
-            for strike in strikes[:20]:  # Limit to 20 strikes
-                for right in ["C", "P"]:
-                    try:
-                        contract = Option(symbol, expiry, strike, right, "SMART")
-                        self.ib.qualifyContracts(contract)
-
-                        ticker = self.ib.reqMktData(contract, snapshot=True)
-                        await asyncio.sleep(0.5)
-                        self.ib.cancelMktData(contract)
-
-                        option_data = {
-                            "strike": strike,
-                            "bid": ticker.bid if ticker.bid == ticker.bid else None,
-                            "ask": ticker.ask if ticker.ask == ticker.ask else None,
-                            "last": ticker.last if ticker.last == ticker.last else None,
-                            "volume": ticker.volume if ticker.volume == ticker.volume else 0,
-                            "delta": ticker.modelGreeks.delta if ticker.modelGreeks else None,
-                            "iv": ticker.modelGreeks.impliedVol if ticker.modelGreeks else None,
-                        }
-
-                        if right == "C":
-                            chain_data["calls"].append(option_data)
-                        else:
-                            chain_data["puts"].append(option_data)
+            # Columnar per side: each field maps to a list aligned by index
+            chain_data = {
+                "calls": {key: [] for key in CHAIN_KEYS},
+                "puts": {key: [] for key in CHAIN_KEYS},
+            }
 
-                    except Exception as e:
-                        logger.warning(f"Failed to get data for {symbol} {expiry} {strike}{right}: {e}")
+            qualified = await self._options(
+                symbol,
+                expiry,
+                [(strike, right) for strike in strikes[:20] for right in ("C", "P")]  # Limit to 20 strikes
+            )
+            if not qualified:
+                return chain_data
+
+            tickers = await self.ib.reqTickersAsync(*qualified)
+
+            for ticker in tickers:
+                contract = ticker.contract
+                greeks = ticker.modelGreeks
+                side = chain_data["calls"] if contract.right == "C" else chain_data["puts"]
+
+                side["strike"].append(contract.strike)
+                side["bid"].append(_nan_to_none(ticker.bid))
+                side["ask"].append(_nan_to_none(ticker.ask))
+                side["last"].append(_nan_to_none(ticker.last))
+                side["volume"].append(_nan_to_none(ticker.volume, 0))
+                side["delta"].append(greeks.delta if greeks else None)
+                side["iv"].append(greeks.impliedVol if greeks else None)
+
+            # Price and greek columns go out as float32 arrays (missing values
+            # become NaN, which orjson writes as null); the precision loss is
+            # well below tick size.
+            for side in chain_data.values():
+                for key in CHAIN_FLOAT_KEYS:
+                    side[key] = np.asarray(side[key], dtype=np.float32)
 
             return chain_data
 
         else:
             raise ValueError(f"Unknown action: {action}")
 
+    async def _handle_and_respond(self, request: Dict[str, Any]):
+        """Handle a single request and send its response back to the server."""
+        try:
+            async with self._request_slots:
+                response = await self.handle_request(request)
+            await self.ws.send(orjson.dumps(response, option=orjson.OPT_SERIALIZE_NUMPY).decode())
+        except Exception as e:
+            logger.error(f"Error processing message: {e}")
+
     async def message_loop(self):
         """Main loop for handling WebSocket messages."""
         if not self.ws:
@@ -348,19 +505,26 @@ class IBKRRelayAgent:
         try:
             async for message in self.ws:
                 try:
-                    request = json.loads(message)
-                    response = await self.handle_request(request)
-                    await self.ws.send(json.dumps(response))
-                except json.JSONDecodeError:
+                    request = orjson.loads(message)
+                except orjson.JSONDecodeError:
                     logger.error(f"Invalid JSON received: {message}")
-                except Exception as e:
-                    logger.error(f"Error processing message: {e}")
+                    continue
+
+                # Handle each request in its own task so a slow chain
+                # request doesn't hold up everything queued behind it
+                task = asyncio.create_task(self._handle_and_respond(request))
+                self._request_tasks.add(task)
+                task.add_done_callback(self._request_tasks.discard)
 
         except ConnectionClosed:
             logger.warning("WebSocket connection closed")
 
+        finally:
+            for task in self._request_tasks:
+                task.cancel()
+
     async def heartbeat_loop(self):
-        """Send periodic heartbeats and status updates."""
+        """Periodically check status and report changes to the server."""
         while self.running:
             try:
                 await self.send_status()
@@ -393,7 +557,7 @@ class IBKRRelayAgent:
                     continue
 
                 # Send initial status
-                await self.send_status()
+                await self.send_status(force=True)
 
                 # Run message and heartbeat loops
                 await asyncio.gather(
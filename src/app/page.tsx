@@ -228,16 +228,22 @@ What would you like to explore?`,
         content: m.content,
       }));
 
-      const result = await api.sendChatMessage(apiMessages);
-
-      const aiResponse: Message = {
-        id: `assistant-${Date.now()}`,
-        role: 'assistant',
-        content: result.response,
-        timestamp: new Date(),
-      };
-
-      setMessages((prev) => [...prev, aiResponse]);
+      // Render the reply as it streams in
+      const assistantId = `assistant-${Date.now()}`;
+      let started = false;
+      const result = await api.streamChatMessage(apiMessages, (text) => {
+        if (!started) {
+          started = true;
+          setMessages((prev) => [
+            ...prev,
+            { id: assistantId, role: 'assistant', content: text, timestamp: new Date() },
+          ]);
+        } else {
+          setMessages((prev) =>
+            prev.map((m) => (m.id === assistantId ? { ...m, content: text } : m))
+          );
+        }
+      });
 
       // Extract suggestions from AI response
       const newSuggestions = extractSuggestionsFromResponse(result.response, suggestions);
@@ -422,7 +428,7 @@ What would you like to explore?`,
                   </div>
                 ))
               )}
-              {isLoading && (
+              {isLoading && messages[messages.length - 1]?.role === 'user' && (
                 <div className="flex gap-2">
                   <div className="h-6 w-6 rounded-full bg-muted flex items-center justify-center">
                     <Bot className="h-3 w-3" />
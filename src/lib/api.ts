@@ -544,6 +544,60 @@ class ApiClient {
     });
   }
 
+  /**
+   * Stream an AI reply over server-sent events.
+   * onUpdate is called with the full text received so far.
+   */
+  async streamChatMessage(
+    messages: { role: string; content: string }[],
+    onUpdate: (text: string) => void
+  ): Promise<{
+    response: string;
+    provider: string;
+  }> {
+    const response = await fetch(`${this.baseUrl}/api/chat/stream`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ messages }),
+    });
+
+    if (!response.ok || !response.body) {
+      const error = await response.json().catch(() => ({ detail: 'Unknown error' }));
+      throw new Error(error.detail || `API error: ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let text = '';
+    let provider = '';
+
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      // Events are separated by a blank line
+      let boundary = buffer.indexOf('\n\n');
+      while (boundary !== -1) {
+        const event = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+        boundary = buffer.indexOf('\n\n');
+
+        if (!event.startsWith('data: ')) continue;
+        const data = JSON.parse(event.slice(6));
+        if (data.error) throw new Error(data.error);
+        if (data.delta) {
+          text += data.delta;
+          onUpdate(text);
+        }
+        if (data.done) provider = data.provider;
+      }
+    }
+
+    return { response: text, provider };
+  }
+
   // ==================== Wheel Chains ====================
 
   async getWheelChains(): Promise<{ chains: WheelChain[] }> {